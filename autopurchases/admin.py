@@ -1,9 +1,7 @@
 import logging
-import uuid
 
 from django.conf import settings
 from django.contrib import admin
-from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
 from django.db import models
 from django.db.models import Case, Count, QuerySet, Value, When
@@ -25,9 +23,9 @@ from autopurchases.models import (
     Shop,
     Stock,
     User,
+    generate_reset_token,
 )
 
-UserModel = get_user_model()
 admin.site.unregister(TokenProxy)
 logger = logging.getLogger(__name__)
 
@@ -91,7 +89,7 @@ class IsManagerListFilter(admin.SimpleListFilter):
         return queryset
 
 
-@admin.register(UserModel)
+@admin.register(User)
 class CustomUserAdmin(UserAdmin):
     list_display = (
         "id",
@@ -190,7 +188,7 @@ class PasswordResetTokenAdmin(admin.ModelAdmin):
     def refresh_rtoken(self, request: HttpRequest, queryset: QuerySet[PasswordResetToken]) -> None:
         rtokens = []
         for rtoken in queryset:
-            rtoken.rtoken = uuid.uuid4()
+            rtoken.rtoken = generate_reset_token()
             rtoken.created_at = timezone.now()
             rtokens.append(rtoken)
         PasswordResetToken.objects.bulk_update(objs=rtokens, fields=["rtoken", "created_at"])
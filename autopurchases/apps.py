@@ -13,4 +13,5 @@ class AutopurchasesConfig(AppConfig):
             new_user_registered,
             order_updated,
             reset_token_created,
+            stock_data_changed,
         )
@@ -0,0 +1,72 @@
+import hashlib
+import logging
+import time
+from collections.abc import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+
+logger = logging.getLogger(__name__)
+
+STOCK_CACHE_VERSION_KEY = "stock-cache-version"
+
+
+def get_stock_cache_key(url: str) -> str:
+    """Функция формирования ключа кэша списка товаров для URL запроса.
+
+    Ключ включает текущую версию кэша, поэтому после сброса (invalidate_stock_cache) ранее
+    сохраненные данные не используются и удаляются по истечении settings.STOCK_CACHE_TIMEOUT.
+
+    Примеры использования:
+        >>> get_stock_cache_key(request.build_absolute_uri())
+        'stock:1760600000000000000:0cc175b9c0f1b6a831c399e269772661'
+    """
+    version: int = cache.get_or_set(STOCK_CACHE_VERSION_KEY, 0, timeout=None)
+    url_hash: str = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+    return f"stock:{version}:{url_hash}"
+
+
+def _set_stock_cache_version() -> None:
+    try:
+        cache.set(STOCK_CACHE_VERSION_KEY, time.time_ns(), None)
+    except Exception:
+        logger.exception(_("Stock cache invalidation failed"))
+
+
+def invalidate_stock_cache() -> None:
+    """Функция сброса кэша списка товаров при изменении данных, отображаемых в списке.
+
+    Вызывается сигнальными функциями (см. autopurchases.signals) и явно после массовых
+    операций (bulk_create, bulk_update), которые сигналы не отправляют.
+
+    Версия кэша обновляется после фиксации текущей транзакции, чтобы параллельный запрос не
+    сохранил в кэш под новой версией данные, прочитанные до фиксации изменений. Ошибка кэша
+    записывается в журнал и на результат операции не влияет.
+    """
+    transaction.on_commit(_set_stock_cache_version)
+
+
+def get_or_set_stock_data(url: str, default: Callable[[], dict | list]) -> dict | list:
+    """Функция получения данных списка товаров из кэша с вычислением при их отсутствии.
+
+    Кэшируются данные ответа до рендеринга, не зависящие от пользователя и формата ответа.
+    При недоступности кэша данные вычисляются без него, ошибка записывается в журнал.
+
+    Примеры использования:
+        >>> get_or_set_stock_data(request.build_absolute_uri(), lambda: serializer.data)
+    """
+    try:
+        cache_key: str = get_stock_cache_key(url)
+        data: dict | list | None = cache.get(cache_key)
+    except Exception:
+        logger.exception(_("Stock cache is unavailable"))
+        return default()
+    if data is None:
+        data = default()
+        try:
+            cache.set(cache_key, data, settings.STOCK_CACHE_TIMEOUT)
+        except Exception:
+            logger.exception(_("Stock cache is unavailable"))
+    return data
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+import autopurchases.models
+
+
+def delete_reset_tokens(apps, schema_editor):
+    # Выданные токены в формате UUID не помещаются в новое поле, пользователи запросят новые
+    PasswordResetToken = apps.get_model('autopurchases', 'PasswordResetToken')
+    PasswordResetToken.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('autopurchases', '0002_stock_order_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_reset_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='passwordresettoken',
+            name='rtoken',
+            field=models.CharField(default=autopurchases.models.generate_reset_token, max_length=24, unique=True, verbose_name='Password reset token'),
+        ),
+        migrations.RunPython(migrations.RunPython.noop, delete_reset_tokens),
+    ]
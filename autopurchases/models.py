@@ -1,12 +1,11 @@
-import uuid
+import secrets
 from datetime import datetime, timedelta
-from uuid import UUID
 
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
-from django.db.models import QuerySet
+from django.db.models import Prefetch, QuerySet
 from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
@@ -130,6 +129,11 @@ class Contact(models.Model):
         )
 
 
+def generate_reset_token() -> str:
+    """Функция генерации токена сброса пароля (22 символа, безопасные для URL)."""
+    return secrets.token_urlsafe(16)
+
+
 class PasswordResetToken(models.Model):
     """Модель таблицы токенов сброса паролей пользователей."""
 
@@ -139,8 +143,11 @@ class PasswordResetToken(models.Model):
         verbose_name=_("User"),
         related_name="rtoken",
     )
-    rtoken: UUID = models.UUIDField(
-        unique=True, default=uuid.uuid4, verbose_name=_("Password reset token")
+    rtoken: str = models.CharField(
+        max_length=24,
+        unique=True,
+        default=generate_reset_token,
+        verbose_name=_("Password reset token"),
     )
     created_at: datetime = models.DateTimeField(verbose_name=_("Created"), auto_now=True)
 
@@ -319,6 +326,17 @@ class ProductsParameters(models.Model):
         ]
 
 
+def parameters_values_queryset() -> QuerySet:
+    """Функция получения QuerySet значений параметров товаров для предварительной загрузки.
+
+    Название параметра загружается тем же запросом, что и значение, загружаются только
+    необходимые для сериализации поля.
+    """
+    return ProductsParameters.objects.select_related("parameter").only(
+        "product", "parameter__name", "value"
+    )
+
+
 class StockManager(models.Manager):
     """Class менеджера модели Stock.
 
@@ -332,8 +350,7 @@ class StockManager(models.Manager):
             "product__category",
             "shop",
         ).prefetch_related(
-            "product__parameters",
-            "product__parameters_values",
+            Prefetch("product__parameters_values", queryset=parameters_values_queryset()),
         )
 
 
@@ -383,6 +400,7 @@ class Stock(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["shop", "product"], name="unique-shop-product")
         ]
+        indexes = [models.Index(fields=["can_buy", "id"], name="stock-can-buy-id")]
 
     def __str__(self):
         return f"{self.product.name} ({self.shop.name})"
@@ -420,7 +438,9 @@ class CartManager(models.Manager):
 
     Изменения:
     - добавлен метод 'wth_dependencies', который оптимизирует загрузку связанных объектов,
-    уменьшая количество запросов к базе данных.
+    уменьшая количество запросов к базе данных;
+    - добавлен метод 'for_list', который загружает одним запросом связанные объекты,
+    необходимые для вывода списков товаров в корзине (без параметров товаров).
     """
 
     def with_dependencies(self) -> QuerySet:
@@ -430,10 +450,14 @@ class CartManager(models.Manager):
             "product__product__category",
             "product__shop",
         ).prefetch_related(
-            "product__product__parameters",
-            "product__product__parameters_values",
+            Prefetch(
+                "product__product__parameters_values", queryset=parameters_values_queryset()
+            ),
         )
 
+    def for_list(self) -> QuerySet:
+        return self.select_related("customer", "product__product__category", "product__shop")
+
 
 class Cart(BaseOrder):
     """Модель ассоциативной таблицы (m2m отношения) таблиц товаров, магазинов и пользователей.
@@ -456,12 +480,20 @@ class OrderManager(CartManager):
 
     Изменения:
     - добавлен метод 'wth_dependencies', который оптимизирует загрузку связанных объектов,
-    уменьшая количество запросов к базе данных.
+    уменьшая количество запросов к базе данных;
+    - добавлен метод 'for_list', который загружает связанные объекты, необходимые для вывода
+    списков заказов (без параметров товаров): данные о товаре на складе загружаются отдельным
+    запросом, а не дублируются в каждой строке заказа.
     """
 
     def with_dependencies(self) -> QuerySet:
         return super().with_dependencies().select_related("delivery_address")
 
+    def for_list(self) -> QuerySet:
+        return self.select_related("customer", "delivery_address").prefetch_related(
+            Prefetch("product", queryset=Stock.objects.select_related("product__category", "shop"))
+        )
+
 
 class Order(BaseOrder):
     """Модель ассоциативной таблицы (m2m отношения) таблиц товаров, магазинов и пользователей.
@@ -490,6 +522,9 @@ class Order(BaseOrder):
         verbose_name = _("Order")
         verbose_name_plural = _("Orders")
         ordering = ["id"]
+        indexes = [
+            models.Index(fields=["customer", "-created_at", "-id"], name="order-customer-created")
+        ]
 
     def __str__(self):
         return f"{super().__str__()} -> {self.delivery_address}"
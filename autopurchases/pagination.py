@@ -0,0 +1,22 @@
+from rest_framework.pagination import CursorPagination
+
+
+class StockCursorPagination(CursorPagination):
+    """Class курсорной пагинации списка товаров.
+
+    Изменения (относительно rest_framework.pagination.CursorPagination):
+    - сортировка по умолчанию по идентификатору товара на складе.
+    """
+
+    ordering = "id"
+
+
+class OrderCursorPagination(CursorPagination):
+    """Class курсорной пагинации списка заказов.
+
+    Изменения (относительно rest_framework.pagination.CursorPagination):
+    - сортировка по умолчанию по дате создания заказа (сначала новые), при совпадении даты -
+      по идентификатору заказа.
+    """
+
+    ordering = ("-created_at", "-id")
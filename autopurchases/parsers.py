@@ -0,0 +1,21 @@
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class ORJSONParser(BaseParser):
+    """Class парсера данных в формате JSON на основе библиотеки orjson.
+
+    Изменения (относительно rest_framework.parsers.JSONParser):
+    - десериализация выполняется средствами orjson напрямую из байтов тела запроса, без
+        промежуточного декодирования в строку;
+    - значения NaN и Infinity, как и в строгом режиме JSONParser, не поддерживаются.
+    """
+
+    media_type = "application/json"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,39 @@
+import orjson
+from django.utils.http import parse_header_parameters
+from rest_framework.encoders import JSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Class рендерера данных в формат JSON на основе библиотеки orjson.
+
+    Изменения (относительно rest_framework.renderers.JSONRenderer):
+    - сериализация выполняется средствами orjson;
+    - типы, не поддерживаемые orjson (lazy-строки, Decimal, QuerySet и т.д.), преобразуются
+        стандартным JSONEncoder DRF;
+    - orjson поддерживает только отступ в 2 пробела, поэтому любой запрошенный отступ
+        (параметр indent в заголовке Accept или в контексте рендерера) приводится к нему.
+    """
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b""
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=self.encoder.default, option=options)
+
+    def get_indent(self, accepted_media_type: str | None, renderer_context: dict) -> int | None:
+        if accepted_media_type:
+            _, params = parse_header_parameters(accepted_media_type)
+            try:
+                return max(min(int(params["indent"]), 8), 0)
+            except (KeyError, ValueError, TypeError):
+                pass
+        return renderer_context.get("indent", None)
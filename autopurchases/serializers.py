@@ -1,11 +1,13 @@
+import copy
 import logging
 
 from django.conf import settings
-from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth import authenticate
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.password_validation import validate_password
 from django.db import models, transaction
-from django.db.models import QuerySet
+from django.db.models import QuerySet, prefetch_related_objects
+from django.db.models.signals import post_save
 from django.utils.text import format_lazy
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
@@ -13,6 +15,7 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.request import Request
 from rest_framework.reverse import reverse
 
+from autopurchases.cache import invalidate_stock_cache
 from autopurchases.models import (
     Cart,
     Category,
@@ -28,7 +31,6 @@ from autopurchases.models import (
 )
 
 logger = logging.getLogger(__name__)
-UserModel = get_user_model()
 
 
 class NormalizedEmailField(serializers.EmailField):
@@ -48,12 +50,32 @@ class CustomModelSerializer(serializers.ModelSerializer):
     """Class кастомного CustomModelSerializer.
 
     Изменения:
-    - изменена таблица соответствия поля ORM EmailFiels и поля сериализатора NormalizedEmailField.
+    - изменена таблица соответствия поля ORM EmailFiels и поля сериализатора NormalizedEmailField;
+    - набор полей, построенный по модели, кэшируется на уровне класса сериализатора и при
+        создании экземпляра копируется, а не строится заново.
     """
 
     serializer_field_mapping = {**serializers.ModelSerializer.serializer_field_mapping}
     serializer_field_mapping[models.EmailField] = NormalizedEmailField
 
+    def get_fields(self) -> dict[str, serializers.Field]:
+        cls = type(self)
+        cached_fields: dict[str, serializers.Field] | None = cls.__dict__.get("_cached_fields")
+        if cached_fields is None:
+            cached_fields = super().get_fields()
+            cls._cached_fields = cached_fields
+        # Поля привязываются (bind) к экземпляру сериализатора, поэтому каждому экземпляру
+        # нужны собственные объекты полей. Вложенные сериализаторы и множественные связи
+        # содержат дочерние поля и копируются полностью
+        return {
+            name: (
+                copy.deepcopy(field)
+                if isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField))
+                else copy.copy(field)
+            )
+            for name, field in cached_fields.items()
+        }
+
 
 class ContactSerializer(CustomModelSerializer):
     """Serializer-class для работы с контактами (адресами).
@@ -77,7 +99,7 @@ class ContactSerializer(CustomModelSerializer):
 
     Дополнительная валидация:
     - валидация на уровне объекта:
-        Единовременное количество объектов Contact, связанных с UserModel не может быть
+        Единовременное количество объектов Contact, связанных с User не может быть
         больше settings.MAX_CONTACTS_FOR_USER.
     """
 
@@ -146,7 +168,7 @@ class UserSerializer(CustomModelSerializer):
     contacts = ContactSerializer(many=True, read_only=True)
 
     class Meta:
-        model = UserModel
+        model = User
         fields = ["id", "email", "first_name", "last_name", "password", "phone", "contacts"]
         extra_kwargs = {"password": {"write_only": True, "validators": [validate_password]}}
 
@@ -181,7 +203,7 @@ class PasswordResetSerializer(serializers.Serializer):
         }
     """
 
-    rtoken = serializers.UUIDField()
+    rtoken = serializers.CharField()
     password = serializers.CharField(
         write_only=True, max_length=128, validators=[validate_password]
     )
@@ -207,7 +229,7 @@ class ShopSerializer(CustomModelSerializer):
     """
 
     managers = serializers.PrimaryKeyRelatedField(
-        many=True, queryset=UserModel.objects.all(), required=False
+        many=True, queryset=User.objects.all(), required=False
     )
 
     class Meta:
@@ -377,6 +399,93 @@ class ParameterSerializer(CustomModelSerializer):
         return repr
 
 
+class ProductListSerializer(serializers.ListSerializer):
+    """Serializer-class списка ProductSerializer.
+
+    Изменения:
+    - создание товаров выполняется пакетно: категории, товары, параметры, значения параметров
+        и записи о наличии товаров на складе магазина загружаются и создаются несколькими
+        запросами на весь список, а не на каждый товар.
+    """
+
+    batch_size = 500
+
+    @transaction.atomic
+    def create(self, validated_data: list[dict[str, str | int | dict]]) -> list[Product]:
+        shop: Shop = self.context["shop"]
+
+        categories: dict[str, Category] = self._get_or_create_by_name(
+            Category, {product_info["category"]["name"] for product_info in validated_data}
+        )
+        parameters: dict[str, Parameter] = self._get_or_create_by_name(
+            Parameter,
+            {
+                params["name"]
+                for product_info in validated_data
+                for params in product_info["parameters_values"]
+            },
+        )
+
+        products: dict[str, Product] = Product.objects.in_bulk(
+            {product_info["name"] for product_info in validated_data}, field_name="name"
+        )
+        new_products: dict[str, Product] = {}
+        for product_info in validated_data:
+            if product_info["name"] not in products and product_info["name"] not in new_products:
+                new_products[product_info["name"]] = Product(
+                    category=categories[product_info["category"]["name"]],
+                    model=product_info["model"],
+                    name=product_info["name"],
+                )
+        Product.objects.bulk_create(new_products.values(), batch_size=self.batch_size)
+        products.update(new_products)
+
+        ProductsParameters.objects.bulk_create(
+            [
+                ProductsParameters(
+                    product=products[product_info["name"]],
+                    parameter=parameters[params["name"]],
+                    value=params["value"],
+                )
+                for product_info in validated_data
+                for params in product_info["parameters_values"]
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+
+        stocks: list[Stock] = []
+        for product_info in validated_data:
+            stock_kwargs = {
+                "shop": shop,
+                "product": products[product_info["name"]],
+                "price": product_info["price"],
+                "quantity": product_info["quantity"],
+            }
+            if "can_buy" in product_info:
+                stock_kwargs["can_buy"] = product_info["can_buy"]
+            stocks.append(Stock(**stock_kwargs))
+        Stock.objects.bulk_create(stocks, batch_size=self.batch_size)
+        # bulk_create не отправляет сигнал post_save, кэш списка товаров сбрасывается явно
+        invalidate_stock_cache()
+
+        return [products[product_info["name"]] for product_info in validated_data]
+
+    def _get_or_create_by_name(
+        self, model: type[Category | Parameter], names: set[str]
+    ) -> dict[str, Category | Parameter]:
+        objects: dict[str, Category | Parameter] = model.objects.in_bulk(names, field_name="name")
+        missing: set[str] = names - objects.keys()
+        if missing:
+            model.objects.bulk_create(
+                [model(name=name) for name in missing],
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+            objects.update(model.objects.in_bulk(missing, field_name="name"))
+        return objects
+
+
 class ProductSerializer(CustomModelSerializer):
     """Serializer-class для работы с товарами.
 
@@ -417,6 +526,7 @@ class ProductSerializer(CustomModelSerializer):
         model = Product
         fields = ["id", "category", "model", "name", "price", "quantity", "parameters", "can_buy"]
         extra_kwargs = {"name": {"validators": []}}
+        list_serializer_class = ProductListSerializer
 
     @transaction.atomic
     def create(self, validated_data: dict[str, str | int | dict]) -> Product:
@@ -448,6 +558,14 @@ class ProductSerializer(CustomModelSerializer):
 
         return product
 
+    def to_representation(self, instance: Product) -> dict[str, str | int | dict]:
+        """Метод возврата сериализованных данных.
+
+        Данные формируются функцией product_to_dict напрямую из атрибутов объекта, без обхода
+        полей сериализатора.
+        """
+        return product_to_dict(instance)
+
 
 class EmailAuthTokenSerializer(serializers.Serializer):
     """Serializer-class для работы с токенами аутентификации.
@@ -563,18 +681,11 @@ class StockSerializer(CustomModelSerializer):
                         ...
                     }
                 }
-        """
-        repr: dict[str, int | dict] = super().to_representation(instance)
-
-        repr["shop"] = repr["shop"]["name"]
 
-        product_info: dict = repr.pop("product")
-        repr["category"] = product_info["category"]
-        repr["model"] = product_info["model"]
-        repr["name"] = product_info["name"]
-        repr["parameters"] = product_info["parameters"]
-
-        return repr
+            Данные формируются функцией stock_to_dict напрямую из атрибутов объекта, без обхода
+            полей сериализатора.
+        """
+        return stock_to_dict(instance)
 
 
 class CartSerializer(CustomModelSerializer):
@@ -690,49 +801,81 @@ class CartSerializer(CustomModelSerializer):
                         ...
                     }
                 }
-        """
-        repr: dict[str, int | dict] = super().to_representation(instance)
 
-        customer_info: dict = repr.pop("customer_read")
-        repr["customer"] = customer_info["email"]
-
-        repr.pop("product")
-        product_info: dict = repr.pop("product_read")
-        repr["shop"] = product_info["shop"]
-        repr["category"] = product_info["category"]
-        repr["model"] = product_info["model"]
-        repr["name"] = product_info["name"]
-
-        return repr
+            Данные формируются функцией cart_to_dict напрямую из атрибутов объекта, без обхода
+            полей сериализатора.
+        """
+        return cart_to_dict(instance)
 
 
 class OrderListSerializer(serializers.ListSerializer):
+    @transaction.atomic
     def create(self, validated_data: list[dict]) -> list[Order]:
         validated_data: dict = validated_data[0]
         delivery_address, _ = Contact.objects.get_or_create(**validated_data["delivery_address"])
-        cart: QuerySet[Cart] = self.context["cart"]
-        created_orders = []
+        cart: list[Cart] = self.context["cart"]
+        # Товары в корзине блокируются до завершения транзакции, товары, уже заказанные
+        # параллельным запросом (удаленные из корзины), повторно не заказываются. Количество
+        # товара читается вместе с блокировкой, изменения после загрузки корзины учитываются
+        locked_quantities: dict[int, int] = dict(
+            Cart.objects.select_for_update()
+            .filter(pk__in=[product.pk for product in cart])
+            .values_list("pk", "quantity")
+        )
+        cart = [product for product in cart if product.pk in locked_quantities]
+        for product in cart:
+            product.quantity = locked_quantities[product.pk]
+        # Актуальные остатки блокируются до завершения транзакции, поэтому проверка и списание
+        # выполняются по данным из базы, а не по закешированным через select_related объектам
+        stocks: dict[int, Stock] = (
+            Stock.objects.select_for_update()
+            .only("quantity", "price", "can_buy")
+            .in_bulk([product.product_id for product in cart])
+        )
+        ordered_products: list[Cart] = []
+        orders: list[Order] = []
         for product in cart:
-            stock: Stock = product.product
-            # Из-за кеширования через select_related требуется обновление объекта stock
-            stock.refresh_from_db(fields=["quantity", "can_buy"])
+            stock: Stock = stocks[product.product_id]
             try:
                 check_availability(can_buy=stock.can_buy)
                 check_quantity(on_stock=stock.quantity, in_order=product.quantity)
             except ValidationError:
                 continue
-            with transaction.atomic():
-                stock.quantity -= product.quantity
-                stock.save(update_fields=["quantity"])
-                order = self.child.Meta.model.objects.create(
+            stock.quantity -= product.quantity
+            ordered_products.append(product)
+            orders.append(
+                self.child.Meta.model(
                     customer=product.customer,
                     product=product.product,
                     quantity=product.quantity,
+                    total_price=stock.price * product.quantity,
                     delivery_address=delivery_address,
                 )
-                product.delete()
-                created_orders.append(order)
+            )
+        if not orders:
+            return []
 
+        Stock.objects.bulk_update(
+            [stocks[pk] for pk in {product.product_id for product in ordered_products}],
+            fields=["quantity"],
+        )
+        # bulk_update не отправляет сигнал post_save, кэш списка товаров сбрасывается явно
+        invalidate_stock_cache()
+        created_orders: list[Order] = self.child.Meta.model.objects.bulk_create(orders)
+        Cart.objects.filter(pk__in=[product.pk for product in ordered_products]).delete()
+        # bulk_create не отправляет сигнал post_save, уведомления о новых заказах
+        # отправляются явно. Связанные объекты заказов уже загружены вместе с корзиной,
+        # менеджеры магазинов догружаются одним запросом для всех заказов
+        prefetch_related_objects(created_orders, "product__shop__managers")
+        for order in created_orders:
+            post_save.send(
+                sender=self.child.Meta.model,
+                instance=order,
+                created=True,
+                update_fields=None,
+                raw=False,
+                using=self.child.Meta.model.objects.db,
+            )
         return created_orders
 
 
@@ -865,19 +1008,11 @@ class OrderSerializer(CustomModelSerializer):
                         ...
                     }
                 }
-        """
-        repr: dict[str, int | dict] = super().to_representation(instance)
-
-        repr["customer"] = repr["customer"]["email"]
-
-        product_info: dict = repr.pop("product")
-        repr["shop"] = product_info["shop"]
-        repr["category"] = product_info["category"]
-        repr["model"] = product_info["model"]
-        repr["name"] = product_info["name"]
 
-        repr["delivery_address"].pop("id")
-        return repr
+            Данные формируются функцией order_to_dict напрямую из атрибутов объекта, без обхода
+            полей сериализатора.
+        """
+        return order_to_dict(instance)
 
     def validate_delivery_address(self, value: dict[str, str]) -> dict[str, str]:
         request: Request = self.context["request"]
@@ -914,3 +1049,150 @@ def check_availability(can_buy: bool) -> None:
         error_msg = _("The selected product is not available for order")
         logger.error(error_msg)
         raise ValidationError(error_msg)
+
+
+_datetime_field = serializers.DateTimeField()
+
+
+def product_to_dict(product: Product) -> dict[str, str | int | dict]:
+    """Функция сериализации объекта Product без использования механизма полей DRF.
+
+    Формат выходных данных совпадает с форматом ProductSerializer. Связанные объекты должны
+    быть предварительно загружены.
+
+    :param Product product: объект Product
+    :return dict: сериализованные данные
+    """
+    return {
+        "id": product.id,
+        "category": product.category.name,
+        "model": product.model,
+        "name": product.name,
+        "parameters": {
+            param.parameter.name: param.value for param in product.parameters_values.all()
+        },
+    }
+
+
+def stock_to_dict(stock: Stock) -> dict[str, str | int | bool | dict]:
+    """Функция сериализации объекта Stock без использования механизма полей DRF.
+
+    Формат выходных данных совпадает с форматом StockSerializer. Связанные объекты должны
+    быть предварительно загружены (см. StockManager.with_dependencies).
+
+    :param Stock stock: объект Stock
+    :return dict: сериализованные данные
+    """
+    product: Product = stock.product
+    return {
+        "id": stock.id,
+        "shop": stock.shop.name,
+        "quantity": stock.quantity,
+        "price": stock.price,
+        "can_buy": stock.can_buy,
+        "category": product.category.name,
+        "model": product.model,
+        "name": product.name,
+        "parameters": {
+            param.parameter.name: param.value for param in product.parameters_values.all()
+        },
+    }
+
+
+def cart_to_dict(cart: Cart) -> dict[str, str | int]:
+    """Функция сериализации объекта Cart без использования механизма полей DRF.
+
+    Формат выходных данных совпадает с форматом CartSerializer. Связанные объекты должны
+    быть предварительно загружены (см. CartManager.for_list).
+
+    :param Cart cart: объект Cart
+    :return dict: сериализованные данные
+    """
+    stock: Stock = cart.product
+    product: Product = stock.product
+    return {
+        "id": cart.id,
+        "customer": cart.customer.email,
+        "quantity": cart.quantity,
+        "total_price": cart.total_price,
+        "shop": stock.shop.name,
+        "category": product.category.name,
+        "model": product.model,
+        "name": product.name,
+    }
+
+
+def order_to_dict(order: Order) -> dict[str, str | int | dict]:
+    """Функция сериализации объекта Order без использования механизма полей DRF.
+
+    Формат выходных данных совпадает с форматом OrderSerializer. Связанные объекты должны
+    быть предварительно загружены (см. OrderManager.with_dependencies).
+
+    :param Order order: объект Order
+    :return dict: сериализованные данные
+    """
+    stock: Stock = order.product
+    product: Product = stock.product
+    delivery_address: Contact = order.delivery_address
+    return {
+        "id": order.id,
+        "customer": order.customer.email,
+        "quantity": order.quantity,
+        "total_price": order.total_price,
+        "delivery_address": {
+            "city": delivery_address.city,
+            "street": delivery_address.street,
+            "house": delivery_address.house,
+            "apartment": delivery_address.apartment,
+        },
+        "status": order.status,
+        "created_at": _datetime_field.to_representation(order.created_at),
+        "updated_at": _datetime_field.to_representation(order.updated_at),
+        "shop": stock.shop.name,
+        "category": product.category.name,
+        "model": product.model,
+        "name": product.name,
+    }
+
+
+def serializer_only(
+    queryset: QuerySet, serializer_class: type[serializers.ModelSerializer]
+) -> QuerySet:
+    """Функция ограничения набора загружаемых из базы данных полей модели.
+
+    Набор полей определяется по полям сериализатора, участвующим в сериализации. Поля только
+    для записи и множественные связи (загружаемые через prefetch_related) не учитываются.
+    Поля вложенных сериализаторов учитываются только для связей, загружаемых через
+    select_related, для остальных связей загружается только внешний ключ.
+
+    :param QuerySet queryset: исходный QuerySet
+    :param type[serializers.ModelSerializer] serializer_class: класс сериализатора
+    :return QuerySet: QuerySet с ограниченным набором загружаемых полей
+    """
+    fields = _get_serializer_sources(serializer_class(), queryset.query.select_related)
+    return queryset.only(*fields)
+
+
+def _get_serializer_sources(
+    serializer: serializers.BaseSerializer, select_related: dict | bool, prefix: str = ""
+) -> list[str]:
+    sources = []
+    for field in serializer.fields.values():
+        if field.write_only or isinstance(
+            field, (serializers.ListSerializer, serializers.ManyRelatedField)
+        ):
+            continue
+        path = prefix + "__".join(field.source_attrs)
+        if (
+            isinstance(field, serializers.BaseSerializer)
+            and isinstance(select_related, dict)
+            and field.source in select_related
+        ):
+            sources.extend(
+                _get_serializer_sources(
+                    field, select_related=select_related[field.source], prefix=f"{path}__"
+                )
+            )
+        else:
+            sources.append(path)
+    return sources
@@ -1,11 +1,12 @@
 from datetime import timedelta
 
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
 
-from autopurchases.models import Order, PasswordResetToken, User
+from autopurchases.cache import invalidate_stock_cache
+from autopurchases.models import Category, Order, PasswordResetToken, Product, Shop, Stock, User
 from autopurchases.tasks import send_email
 
 
@@ -66,14 +67,13 @@ def new_order_created(sender: Order, instance: Order, created: bool = False, **k
 
     Действия:
     - асинхронная отправка уведомлений о новом заказе на email заказчика и менеджерам магазина.
+
+    Связанные объекты берутся из переданного экземпляра заказа, поэтому при массовом создании
+    заказов их следует загрузить заранее (в том числе менеджеров магазина).
     """
     if created:
         subject = "New order created!"
-        order: Order = (
-            Order.objects.with_dependencies()
-            .prefetch_related("product__shop__managers")
-            .get(pk=instance.id)
-        )
+        order: Order = instance
         apartment: int | None = order.delivery_address.apartment
         customer: User = order.customer
         header_for_user = (
@@ -152,3 +152,20 @@ def order_updated(
             "AutopurchasesDjangoApp Team."
         )
         send_email.delay_on_commit(subject=subject, body=body, to=[customer.email])
+
+
+@receiver([post_save, post_delete], sender=Stock)
+@receiver([post_save, post_delete], sender=Shop)
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+def stock_data_changed(sender: type[Stock | Shop | Product | Category], **kwargs):
+    """Сигнальная функция.
+
+    Триггер:
+    - создание/обновление/удаление товара на складе, магазина, товара или категории (в т.ч.
+      через административную панель и каскадное удаление).
+
+    Действия:
+    - сброс кэша списка товаров (после фиксации транзакции).
+    """
+    invalidate_stock_cache()
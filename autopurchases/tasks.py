@@ -1,8 +1,10 @@
+import functools
 import logging
 
+import orjson
+import yaml
 from celery import shared_task
 from django.conf import settings
-from django.contrib.auth import get_user_model
 from django.core.mail import EmailMessage
 from django.db import transaction
 from django.utils.text import format_lazy
@@ -12,7 +14,6 @@ from autopurchases.models import Shop, Stock, User
 from autopurchases.serializers import ProductSerializer, ShopSerializer, StockSerializer
 
 logger = logging.getLogger(__name__)
-UserModel = get_user_model()
 
 
 @shared_task(bind=True)
@@ -46,12 +47,14 @@ def send_email(self, subject: str, body: str, to: list[str]) -> None:
 
 
 @shared_task(bind=True)
-def import_shop(self, data: dict[str, str | list[dict]], user_id: int) -> None:
+def import_shop(self, data: bytes, content_type: str, user_id: int) -> None:
     """Задача Celery, выполняющая асинхронную загрузку информации о магазине в базу данных.
 
-    :param dict[str, str | list[dict]] data: информация о магазине
+    :param bytes data: информация о магазине в необработанном виде
+    :param str content_type: тип содержимого data ("application/yaml" или "application/json")
     :param int user_id: идентификатор пользователя (данный пользователь будет помечен как владелец
         магазина)
+    :raises Exception: при ошибке разбора или загрузки данных (задача получает статус FAILURE)
     """
     msg = format_lazy(
         _("Celery task '{name}' {id} started"), name=self.name.split(".")[-1], id=self.request.id
@@ -59,14 +62,19 @@ def import_shop(self, data: dict[str, str | list[dict]], user_id: int) -> None:
     logger.info(msg)
 
     try:
+        shop_data: dict[str, str | list[dict]] = (
+            yaml.load(data, Loader=yaml.CSafeLoader)
+            if content_type == "application/yaml"
+            else orjson.loads(data)
+        )
         with transaction.atomic():
-            user: User = UserModel.objects.get(pk=user_id)
-            shop_info: str = data["shop"]
+            user: User = User.objects.get(pk=user_id)
+            shop_info: str = shop_data["shop"]
             shop_ser = ShopSerializer(data=shop_info, context={"owner": user})
             shop_ser.is_valid(raise_exception=True)
             shop_ser.save()
 
-            products_info: list[dict] = data["products"]
+            products_info: list[dict] = shop_data["products"]
             products_ser = ProductSerializer(
                 data=products_info, many=True, context={"shop": shop_ser.instance}
             )
@@ -84,14 +92,22 @@ def import_shop(self, data: dict[str, str | list[dict]], user_id: int) -> None:
             error=exc,
         )
         logger.exception(error_msg)
+        # Задача завершается со статусом FAILURE, клиент узнает об ошибке импорта по статусу
+        raise
 
 
 @shared_task(bind=True)
-def export_shop(self, shop_id: int) -> dict[str, str | list[dict]]:
+def export_shop(self, shop_id: int) -> dict[str, str | list[str]]:
     """Задача Celery, выполняющая асинхронную выгрузку информации о магазине из базы данных.
 
+    Информация о магазине сериализуется в поддерживаемые форматы (yaml и json) однократно,
+    при выполнении задачи, и сохраняется в результате задачи в готовом к отдаче виде - списком
+    фрагментов, которые отдаются клиенту потоком по мере чтения. Выгрузки в обоих форматах
+    разбиваются на фрагменты по товарам.
+
     :param int shop_id: идентификатор магазина
-    :return dict[str, str | list[dict]]: информация о магазине
+    :return dict[str, str | list[str]]: название магазина и информация о магазине в форматах
+        yaml и json
     """
     msg = format_lazy(
         _("Celery task '{name}' {id} started"), name=self.name.split(".")[-1], id=self.request.id
@@ -106,7 +122,27 @@ def export_shop(self, shop_id: int) -> dict[str, str | list[dict]]:
         for product in stock_ser.data
     ]
 
-    result = {"shop": shop.name, "products": stock_data}
+    yaml_dump = functools.partial(
+        yaml.dump, Dumper=yaml.CSafeDumper, allow_unicode=True, sort_keys=False
+    )
+    yaml_chunks = [yaml_dump({"shop": shop.name})]
+    if stock_data:
+        yaml_chunks.append("products:\n")
+        yaml_chunks.extend(yaml_dump([product]) for product in stock_data)
+    else:
+        yaml_chunks.append(yaml_dump({"products": []}))
+
+    json_chunks = [f'{{"shop":{orjson.dumps(shop.name).decode()},"products":[']
+    json_chunks.extend(
+        f"{',' if index else ''}{orjson.dumps(product).decode()}"
+        for index, product in enumerate(stock_data)
+    )
+    json_chunks.append("]}")
+    result = {
+        "shop": shop.name,
+        "yaml": yaml_chunks,
+        "json": json_chunks,
+    }
 
     msg = format_lazy(_("Shop '{name}' import finished"), name=shop.name)
     logger.info(msg)
@@ -20,6 +20,7 @@ from rest_framework.routers import DefaultRouter
 
 from autopurchases.views import (
     CartViewSet,
+    CeleryTaskListView,
     CeleryTaskView,
     DownloadFileView,
     EmailObtainAuthToken,
@@ -39,6 +40,7 @@ urlpatterns = [
     path("", include(router.urls)),
     path("order/", OrderView.as_view(), name="order"),
     path("stock/", StockView.as_view(), name="stock"),
+    path("task/", CeleryTaskListView.as_view(), name="celery-results"),
     path("task/<str:task_id>/", CeleryTaskView.as_view(), name="celery-result"),
     path("download/<str:task_id>/", DownloadFileView.as_view(), name="download-file"),
     path("login/", EmailObtainAuthToken.as_view(), name="login"),
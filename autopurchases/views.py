@@ -1,18 +1,22 @@
-import json
+import functools
 import logging
+import time
 import uuid
+from datetime import datetime
 from io import BytesIO
 
-import yaml
+from celery import states
 from celery.result import AsyncResult
 from django.conf import settings
-from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import QuerySet
+from django.db import transaction
+from django.db.models import Prefetch, QuerySet
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.utils.text import format_lazy
+from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
+from django_celery_results.models import TaskResult
 from rest_framework import status
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.decorators import action
@@ -23,10 +27,9 @@ from rest_framework.exceptions import (
     UnsupportedMediaType,
 )
 from rest_framework.generics import ListAPIView
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from rest_framework.renderers import JSONRenderer
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
@@ -35,6 +38,7 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework_yaml.parsers import YAMLParser
 from rest_framework_yaml.renderers import YAMLRenderer
 
+from autopurchases.cache import get_or_set_stock_data
 from autopurchases.exceptions import BadRequest, Conflict
 from autopurchases.filters import OrderFilter, StockFilter
 from autopurchases.models import (
@@ -45,13 +49,17 @@ from autopurchases.models import (
     Shop,
     Stock,
     User,
+    generate_reset_token,
 )
+from autopurchases.pagination import OrderCursorPagination, StockCursorPagination
+from autopurchases.parsers import ORJSONParser
 from autopurchases.permissions import (
     IsCartOwnerOrAdmin,
     IsManagerOrAdmin,
     IsManagerOrAdminOrReadOnly,
     IsMeOrAdminOrReadOnly,
 )
+from autopurchases.renderers import ORJSONRenderer
 from autopurchases.serializers import (
     CartSerializer,
     ContactSerializer,
@@ -62,11 +70,13 @@ from autopurchases.serializers import (
     ShopSerializer,
     StockSerializer,
     UserSerializer,
+    order_to_dict,
+    serializer_only,
+    stock_to_dict,
 )
 from autopurchases.tasks import export_shop, import_shop
 
 logger = logging.getLogger(__name__)
-UserModel = get_user_model()
 
 
 class UserFilterMixin:
@@ -111,12 +121,22 @@ class UserViewSet(ModelViewSet):
                 "house": int,
                 "apartment": int  # опционально
             }
+        В ответе возвращается только созданный контакт, полный профиль пользователя со списком
+        контактов доступен по GET /<int:user.id>/.
+        Пример тела ответа (в формате JSON):
+            {
+                "id": int,
+                "city": str,
+                "street": str,
+                "house": str,
+                "apartment": str | null
+            }
     - DELETE /<int:user.id>/contacts/<int:contact.id>/: Удаление выбранного контакта пользователя
-        (адреса).
+        (адреса). Ответ не содержит тела.
     - GET /reset/?email=<str:email>: Создание и получение токена сброса пароля. Для этого в query
         string необходимо передать email (str) зарегистрированного пользователя.
     - PATCH /reset/confirm/: Сброс старого пароля пользователя. Для этого необходимо передать
-        токен сброса пароля (str) и новый пароль (str).
+        токен сброса пароля (str) и новый пароль (str). Использованный токен удаляется.
         Пример тела запроса (в формате JSON):
             {
                 "rtoken": str,
@@ -135,9 +155,7 @@ class UserViewSet(ModelViewSet):
         contact_ser.is_valid(raise_exception=True)
         contact_ser.save()
 
-        user.refresh_from_db(fields=["contacts"])
-        user_ser = UserSerializer(user)
-        return Response(user_ser.data, status=status.HTTP_201_CREATED)
+        return Response(contact_ser.data, status=status.HTTP_201_CREATED)
 
     @action(
         methods=["DELETE"],
@@ -147,16 +165,13 @@ class UserViewSet(ModelViewSet):
     )
     def delete_contact(self, request: Request, pk: str, contact_pk: str) -> Response:
         user: User = self.get_object()
-        contact: Contact | None = Contact.objects.filter(user=user, pk=contact_pk).first()
-        if contact is None:
-            error_msg = format_lazy(
-                _("Contact pk={pk} not found or does not belong to the user '{email}'"),
-                pk=contact_pk,
-                email=user.email,
-            )
+        deleted: int = Contact.objects.filter(user=user, pk=contact_pk).delete()[0]
+        if not deleted:
+            error_msg = gettext(
+                "Contact pk={pk} not found or does not belong to the user '{email}'"
+            ).format(pk=contact_pk, email=user.email)
             logger.error(error_msg)
             raise BadRequest(error_msg)
-        contact.delete()
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -165,14 +180,16 @@ class UserViewSet(ModelViewSet):
         email_ser = EmailSerializer(data=request.query_params)
         email_ser.is_valid(raise_exception=True)
         try:
-            user: User | None = UserModel.objects.get(email=email_ser.validated_data["email"])
+            user: User | None = User.objects.get(email=email_ser.validated_data["email"])
         except ObjectDoesNotExist:
-            error_msg = format_lazy(
-                _("User '{email}' not found"), email=email_ser.validated_data["email"]
+            error_msg = gettext("User '{email}' not found").format(
+                email=email_ser.validated_data["email"]
             )
             logger.error(error_msg)
             raise NotFound(error_msg)
-        PasswordResetToken.objects.update_or_create(user=user, defaults={"rtoken": uuid.uuid4()})
+        PasswordResetToken.objects.update_or_create(
+            user=user, defaults={"rtoken": generate_reset_token()}
+        )
         return Response(
             {"message": f"Password reset token sent to {email_ser.validated_data["email"]}"},
             status=status.HTTP_200_OK,
@@ -187,14 +204,19 @@ class UserViewSet(ModelViewSet):
     def update_password(self, request: Request) -> Response:
         rtoken_ser = PasswordResetSerializer(data=request.data)
         rtoken_ser.is_valid(raise_exception=True)
-        rtoken = get_object_or_404(PasswordResetToken, rtoken=rtoken_ser.validated_data["rtoken"])
+        rtoken = get_object_or_404(
+            PasswordResetToken.objects.select_related("user"),
+            rtoken=rtoken_ser.validated_data["rtoken"],
+        )
         if not rtoken.is_valid():
             error_msg = _("Password reset token expired")
             logger.warning(error_msg)
             raise AuthenticationFailed(error_msg)
         user: User = rtoken.user
         user.set_password(raw_password=rtoken_ser.validated_data["password"])
-        user.save()
+        with transaction.atomic():
+            user.save(update_fields=["password"])
+            rtoken.delete()
         return Response({"message": "Password updated successfully"}, status=status.HTTP_200_OK)
 
 
@@ -255,11 +277,21 @@ class ShopViewSet(ModelViewSet):
     """
 
     serializer_class = ShopSerializer
-    queryset = Shop.objects.all()
+    # Для сериализации и проверки прав достаточно идентификаторов менеджеров
+    queryset = Shop.objects.prefetch_related(
+        Prefetch("managers", queryset=User.objects.only("id"))
+    )
     permission_classes = [IsAuthenticatedOrReadOnly, IsManagerOrAdminOrReadOnly]
     lookup_field = "slug"
 
-    def get_data(self, request: Request) -> dict[str, str | list[dict]]:
+    def get_data(self, request: Request) -> tuple[bytes, str]:
+        """Метод получения необработанных данных для импорта магазина.
+
+        Разбор данных (yaml или json) выполняется в задаче Celery, в запросе только проверяется
+        тип содержимого.
+
+        :return tuple[bytes, str]: данные и их тип содержимого
+        """
         content_type = request.content_type.split(";")[0]
         match content_type:
             case "multipart/form-data":
@@ -268,17 +300,13 @@ class ShopViewSet(ModelViewSet):
                     error_msg = _("Attachment required")
                     logger.warning(error_msg)
                     raise BadRequest(error_msg)
-                match file.content_type:
-                    case "application/yaml":
-                        data = yaml.safe_load(file)
-                    case "application/json":
-                        data = json.load(file)
-                    case _:
-                        error_msg = _("Attached file's content type required")
-                        logger.warning(error_msg)
-                        raise ParseError(error_msg)
+                if file.content_type not in ("application/yaml", "application/json"):
+                    error_msg = _("Attached file's content type required")
+                    logger.warning(error_msg)
+                    raise ParseError(error_msg)
+                return file.read(), file.content_type
             case "application/json" | "application/yaml":
-                data = request.data
+                return request.body, content_type
             case _ as unsupported_type:
                 error_msg = _(
                     "Shop import is available with 'multipart/form-data', "
@@ -286,7 +314,6 @@ class ShopViewSet(ModelViewSet):
                 )
                 logger.warning(error_msg)
                 raise UnsupportedMediaType(unsupported_type, error_msg)
-        return data
 
     @action(
         methods=["GET"],
@@ -294,16 +321,18 @@ class ShopViewSet(ModelViewSet):
         url_path="orders",
         url_name="get-orders",
         permission_classes=[IsManagerOrAdmin],
-        pagination_class=PageNumberPagination,
+        pagination_class=OrderCursorPagination,
     )
     def get_shop_orders(self, request: Request, slug: str) -> Response:
         shop: Shop = self.get_object()
-        orders: QuerySet[Order] = Order.objects.with_dependencies().filter(product__shop=shop).all()
-        filter = OrderFilter(data=request.query_params, queryset=orders)
-        paginator = PageNumberPagination()
-        page = paginator.paginate_queryset(queryset=filter.qs, request=request)
-        order_ser = OrderSerializer(page, many=True)
-        return paginator.get_paginated_response(order_ser.data)
+        orders: QuerySet[Order] = serializer_only(
+            Order.objects.for_list().filter(product__shop_id=shop.id), OrderSerializer
+        )
+        filtered_orders: QuerySet[Order] = OrderFilter(
+            data=request.query_params, queryset=orders
+        ).qs
+        page = self.paginator.paginate_queryset(queryset=filtered_orders, request=request)
+        return self.get_paginated_response([order_to_dict(order) for order in page])
 
     @action(
         methods=["PATCH"],
@@ -314,11 +343,13 @@ class ShopViewSet(ModelViewSet):
     )
     def update_shop_order_status(self, request: Request, slug: str, order_pk: str) -> Response:
         shop: Shop = self.get_object()
-        order: Order | None = (
-            Order.objects.with_dependencies().filter(product__shop=shop, pk=order_pk).first()
-        )
-        if order is None:
-            error_msg = format_lazy(_("Order pk={pk} not found"), pk=order_pk)
+        try:
+            # Связанные объекты загружаются одним запросом и используются для ответа
+            order: Order = Order.objects.select_related(
+                "customer", "delivery_address", "product__product__category", "product__shop"
+            ).get(product__shop=shop, pk=order_pk)
+        except ObjectDoesNotExist:
+            error_msg = gettext("Order pk={pk} not found").format(pk=order_pk)
             logger.error(error_msg)
             raise BadRequest(error_msg)
         order_ser = OrderSerializer(
@@ -326,7 +357,7 @@ class ShopViewSet(ModelViewSet):
         )
         order_ser.is_valid(raise_exception=True)
         order_ser.save()
-        return Response(order_ser.data, status=status.HTTP_200_OK)
+        return Response(order_to_dict(order), status=status.HTTP_200_OK)
 
     @action(
         methods=["PATCH"],
@@ -337,27 +368,33 @@ class ShopViewSet(ModelViewSet):
     )
     def update_product_in_stock(self, request: Request, slug: str, stock_pk: str) -> Response:
         shop: Shop = self.get_object()
-        stock = Stock.objects.with_dependencies().filter(shop=shop, pk=stock_pk).first()
-        if stock is None:
-            error_msg = format_lazy(_("Product in stock pk={pk} not found"), pk=stock_pk)
+        try:
+            stock: Stock = Stock.objects.only("id", "quantity", "price", "can_buy").get(
+                shop=shop, pk=stock_pk
+            )
+        except ObjectDoesNotExist:
+            error_msg = gettext("Product in stock pk={pk} not found").format(pk=stock_pk)
             logger.error(error_msg)
             raise BadRequest(error_msg)
         stock_ser = StockSerializer(instance=stock, data=request.data, partial=True)
         stock_ser.is_valid(raise_exception=True)
         stock_ser.save()
-        return Response(stock_ser.data, status=status.HTTP_200_OK)
+        stock: Stock = Stock.objects.with_dependencies().get(pk=stock.pk)
+        return Response(StockSerializer(stock).data, status=status.HTTP_200_OK)
 
     @action(
         methods=["POST"],
         detail=False,
         url_path="import",
         url_name="import",
-        parser_classes=[MultiPartParser, JSONParser, YAMLParser],
+        parser_classes=[MultiPartParser, ORJSONParser, YAMLParser],
     )
     def import_shop(self, request: Request) -> Response:
-        data: dict[str, str | list[dict]] = self.get_data(request=request)
+        data, content_type = self.get_data(request=request)
         user_id: int = request.user.id
-        task: AsyncResult = import_shop.delay(data=data, user_id=user_id)
+        task: AsyncResult = import_shop.delay(
+            data=data, content_type=content_type, user_id=user_id
+        )
         return Response({"task_id": task.id, "status": task.status}, status=status.HTTP_200_OK)
 
     @action(
@@ -406,15 +443,39 @@ class StockView(ListAPIView):
     Доступна сортировка результатов по следующим полям:
     - price: По стоимости товара (например, .../?ordering=price (по возрастанию))
     - quantity: По количеству товара (например, .../?ordering=-quantity (по убыванию))
+
+    Кэширование:
+    Данные ответов (кроме HTML-страниц browsable API) кэшируются с учетом URL запроса на
+    settings.STOCK_CACHE_TIMEOUT секунд. Кэш сбрасывается при изменении остатков на складе.
     """
 
     serializer_class = StockSerializer
-    queryset = Stock.objects.with_dependencies().filter(can_buy=True).all()
+    queryset = serializer_only(
+        Stock.objects.with_dependencies().filter(can_buy=True), StockSerializer
+    )
+
+    pagination_class = StockCursorPagination
 
     search_fields = ["product__model", "product__name", "product__category__name", "shop__name"]
     ordering_fields = ["price", "quantity"]
+    ordering = StockCursorPagination.ordering
     filterset_class = StockFilter
 
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        # HTML-страница browsable API содержит данные пользователя, CSRF-токен и элементы
+        # пагинации, поэтому формируется без кэша
+        if isinstance(request.accepted_renderer, BrowsableAPIRenderer):
+            return Response(self._get_list_data())
+        data = get_or_set_stock_data(request.build_absolute_uri(), self._get_list_data)
+        return Response(data)
+
+    def _get_list_data(self) -> dict | list[dict]:
+        queryset: QuerySet[Stock] = self.filter_queryset(self.get_queryset())
+        page: list[Stock] | None = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response([stock_to_dict(stock) for stock in page]).data
+        return [stock_to_dict(stock) for stock in queryset]
+
 
 class EmailObtainAuthToken(ObtainAuthToken):
     """View-class для получения токена аутентификации по email и паролю.
@@ -464,13 +525,13 @@ class CartViewSet(UserFilterMixin, ModelViewSet):
     """
 
     serializer_class = CartSerializer
-    queryset = Cart.objects.with_dependencies().all()
+    queryset = Cart.objects.for_list()
     permission_classes = [IsAuthenticated, IsCartOwnerOrAdmin]
 
     @action(methods=["POST"], detail=False, url_path="confirm-order", url_name="confirm-order")
     def confirm_order(self, request: Request) -> Response:
-        cart: QuerySet[Cart] = self.get_queryset()
-        if not cart.exists():
+        cart: list[Cart] = list(self.get_queryset())
+        if not cart:
             error_msg = _("Cart is empty")
             logger.error(error_msg)
             raise NotFound(error_msg)
@@ -504,30 +565,93 @@ class OrderView(UserFilterMixin, ListAPIView):
     """
 
     serializer_class = OrderSerializer
-    queryset = Order.objects.with_dependencies().all()
+    queryset = serializer_only(Order.objects.for_list(), OrderSerializer)
+    pagination_class = OrderCursorPagination
+    ordering = OrderCursorPagination.ordering
     filterset_class = OrderFilter
     permission_classes = [IsAuthenticated]
 
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        queryset: QuerySet[Order] = self.filter_queryset(self.get_queryset())
+        page: list[Order] | None = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response([order_to_dict(order) for order in page])
+        return Response([order_to_dict(order) for order in queryset])
+
 
 class CeleryTaskView(APIView):
     """View-class для отслеживания статуса выполения асинхронных задач Celery.
 
     Поддерживаемые HTTP-методы:
     - GET /<str:task.id>/: Получение информации о статусе выполнения задачи.
+
+    Идентификатор задачи должен быть UUID, иначе запрос отклоняется без обращения к хранилищу
+    результатов Celery. Повторные запросы статуса одной задачи в пределах секунды обслуживаются
+    из локального кэша процесса.
     """
 
     def get(self, request: Request, task_id: str) -> Response:
-        task = AsyncResult(id=task_id)
-        response = {"task_id": task.id, "status": task.status}
-        if task.ready() and task.result is not None:
-            response.update(
-                {
-                    "link": (
-                        f"{settings.BASE_URL}"
-                        f"{reverse('autopurchases:download-file', kwargs={"task_id": task.id})}"
-                    )
-                }
+        try:
+            uuid.UUID(task_id)
+        except ValueError:
+            error_msg = gettext("Invalid task id '{id}'").format(id=task_id)
+            logger.error(error_msg)
+            raise BadRequest(error_msg)
+        task_status, has_link = _get_task_state(task_id, int(time.monotonic()))
+        response = {"task_id": task_id, "status": task_status}
+        if has_link:
+            response.update({"link": _get_download_url_template().format(task_id=task_id)})
+        return Response(response)
+
+
+class CeleryTaskListView(APIView):
+    """View-class для отслеживания статуса выполения нескольких асинхронных задач Celery.
+
+    Поддерживаемые HTTP-методы:
+    - GET /?task_ids=<str:task.id>,<str:task.id>,...: Получение информации о статусе выполнения
+        перечисленных задач. Статусы всех задач загружаются из хранилища результатов одним
+        запросом. Задачи, отсутствующие в хранилище, имеют статус PENDING. Количество задач в
+        одном запросе ограничено settings.MAX_TASK_IDS_PER_REQUEST.
+    """
+
+    def get(self, request: Request) -> Response:
+        task_ids: list[str] = [
+            task_id for task_id in request.query_params.get("task_ids", "").split(",") if task_id
+        ]
+        if not task_ids:
+            error_msg = gettext("Task ids required")
+            logger.error(error_msg)
+            raise BadRequest(error_msg)
+        if len(task_ids) > settings.MAX_TASK_IDS_PER_REQUEST:
+            error_msg = gettext("Too many task ids (maximum {max})").format(
+                max=settings.MAX_TASK_IDS_PER_REQUEST
             )
+            logger.error(error_msg)
+            raise BadRequest(error_msg)
+        for task_id in task_ids:
+            try:
+                uuid.UUID(task_id)
+            except ValueError:
+                error_msg = gettext("Invalid task id '{id}'").format(id=task_id)
+                logger.error(error_msg)
+                raise BadRequest(error_msg)
+
+        tasks: dict[str, TaskResult] = {
+            task.task_id: task
+            for task in TaskResult.objects.filter(task_id__in=task_ids).only(
+                "task_id", "task_name", "status"
+            )
+        }
+        response = []
+        for task_id in task_ids:
+            task: TaskResult | None = tasks.get(task_id)
+            task_info = {
+                "task_id": task_id,
+                "status": task.status if task is not None else states.PENDING,
+            }
+            if task is not None and _has_download_link(task.status, task.task_name):
+                task_info["link"] = _get_download_url_template().format(task_id=task_id)
+            response.append(task_info)
         return Response(response)
 
 
@@ -536,16 +660,76 @@ class DownloadFileView(APIView):
 
     Поддерживаемые HTTP-методы:
     - GET /<str:task.id>/: Получение файла с данными о магазине. Требуемый формат файла (yaml или
-        json) можно указать через заголовок Accept в запросе (по умолчанию yaml).
+        json) можно указать через заголовок Accept в запросе (по умолчанию yaml). Имя файла
+        содержит название магазина и дату выполнения задачи выгрузки.
+
+    Рендеринг средствами DRF не выполняется: renderer_classes используются только для выбора
+    формата, содержимое файла отдается потоком в том виде, в котором оно сохранено задачей
+    выгрузки. Для неизвестной задачи возвращается 404, для задачи без файла (импорт, ошибка
+    выполнения, результат в устаревшем формате) - 409.
     """
 
-    renderer_classes = [YAMLRenderer, JSONRenderer]
+    renderer_classes = [YAMLRenderer, ORJSONRenderer]
 
-    def get(self, request: Request, task_id: str) -> Response:
+    def get(self, request: Request, task_id: str) -> StreamingHttpResponse:
         task = AsyncResult(id=task_id)
         ext = request.accepted_renderer.format
-        filename = f"{task.result['shop']}_{timezone.now().date()}.{ext}"
-        resp = Response(task.result)
+        if task.state == states.PENDING:
+            error_msg = gettext("Task '{id}' not found").format(id=task_id)
+            logger.error(error_msg)
+            raise NotFound(error_msg)
+        # Файл доступен только для успешно выполненной задачи выгрузки в текущем формате
+        # результата (не для импорта, ошибок и результатов, сохраненных в прежнем формате)
+        if not (task.successful() and isinstance(task.result, dict) and ext in task.result):
+            error_msg = gettext("Task '{id}' has no file to download").format(id=task_id)
+            logger.error(error_msg)
+            raise Conflict(error_msg)
+        date_done: datetime = task.date_done or timezone.now()
+        filename = f"{task.result['shop']}_{date_done.date()}.{ext}"
+        resp = StreamingHttpResponse(
+            task.result[ext], content_type=request.accepted_renderer.media_type
+        )
         resp["Content-Disposition"] = f"attachment; filename={filename}"
 
         return resp
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_task_state(task_id: str, time_bucket: int) -> tuple[str, bool]:
+    """Функция получения статуса задачи Celery из хранилища результатов.
+
+    Результат кэшируется по паре (task_id, time_bucket), поэтому в пределах одного значения
+    time_bucket хранилище результатов опрашивается не более одного раза для каждой задачи.
+
+    :param str task_id: идентификатор задачи
+    :param int time_bucket: номер временного интервала (секунды)
+    :return tuple[str, bool]: статус задачи и признак наличия ссылки на скачивание результата
+    """
+    task = AsyncResult(id=task_id)
+    return task.status, _has_download_link(task.status, task.name)
+
+
+def _has_download_link(task_status: str, task_name: str | None) -> bool:
+    """Функция проверки доступности результата задачи Celery для скачивания.
+
+    Скачать можно только результат успешно выполненной задачи выгрузки магазина.
+
+    :param str task_status: статус задачи
+    :param str | None task_name: имя задачи
+    :return bool: признак наличия ссылки на скачивание результата
+    """
+    return task_status == states.SUCCESS and task_name == export_shop.name
+
+
+@functools.cache
+def _get_download_url_template() -> str:
+    """Функция получения шаблона ссылки на скачивание результата задачи Celery.
+
+    Разрешение URL выполняется однократно, при первом обращении (не при импорте модуля, так как
+    на этот момент конфигурация URL еще не загружена).
+
+    :return str: шаблон ссылки с полем {task_id}
+    """
+    placeholder = "__task_id__"
+    url: str = reverse("autopurchases:download-file", kwargs={"task_id": placeholder})
+    return f"{settings.BASE_URL}{url.replace(placeholder, '{task_id}')}"
@@ -9,7 +9,7 @@ from celery import Celery
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main.settings")
 
-app = Celery(main="main", broker_connection_retry_on_startup=True)
+app = Celery(main="main")
 
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 
 from django.utils.translation import gettext_lazy as _
@@ -93,6 +94,15 @@ DATABASES = {
     }
 }
 
+# Локальный запуск тестов без PostgreSQL (USE_SQLITE=1 pytest). Переключение действует только
+# при запуске под pytest (runserver и воркеры Celery продолжают использовать PostgreSQL),
+# тестовая база данных SQLite создается в памяти, файл базы данных не создается
+if os.getenv("USE_SQLITE") and "pytest" in sys.modules:
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+        "TEST": {"NAME": ":memory:"},
+    }
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -147,8 +157,17 @@ REST_FRAMEWORK = {
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "autopurchases.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "autopurchases.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
-    "PAGE_SIZE": os.getenv("PAGE_SIZE", 50),
+    "PAGE_SIZE": int(os.getenv("PAGE_SIZE", 50)),
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
         "rest_framework.throttling.UserRateThrottle",
@@ -238,6 +257,22 @@ BROKER_PORT = os.getenv("BROKER_PORT", "6379")
 CELERY_BROKER_URL = f"redis://{BROKER_HOST}:{BROKER_PORT}/0"
 CELERY_RESULT_BACKEND = "django-db"
 CELERY_RESULT_EXTENDED = True
+CELERY_TASK_SERIALIZER = "msgpack"
+CELERY_RESULT_SERIALIZER = "msgpack"
+CELERY_ACCEPT_CONTENT = ["msgpack"]
+CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+CELERY_BROKER_POOL_LIMIT = 10
+CELERY_BROKER_TRANSPORT_OPTIONS = {"visibility_timeout": 3600}
+
+
+# Cache
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{BROKER_HOST}:{BROKER_PORT}/1",
+    }
+}
 
 
 # Smtp server settings
@@ -256,6 +291,8 @@ DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
 PASSWORD_RESET_TOKEN_TTL = {"hours": 1}
 MAX_CONTACTS_FOR_USER = os.getenv("MAX_CONTACTS_FOR_USER", 5)
+STOCK_CACHE_TIMEOUT = int(os.getenv("STOCK_CACHE_TIMEOUT", 30))
+MAX_TASK_IDS_PER_REQUEST = 100
 
 
 # Reorder parameters for custom admin site
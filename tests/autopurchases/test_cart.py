@@ -3,27 +3,34 @@ from django.db.models import QuerySet
 from rest_framework.response import Response
 
 from autopurchases.models import Cart, Order, Stock, User
-from autopurchases.serializers import (
-    CartSerializer,
-    OrderSerializer,
-)
-from tests.utils import CustomAPIClient, sorted_list_of_dicts_by_id
+from autopurchases.serializers import CartSerializer
+from tests.utils import CustomAPIClient, to_dict_minimal
 
 pytestmark = pytest.mark.django_db
 
+ORDER_FIELDS = ("id", "quantity", "total_price", "status")
+
 
 class TestGetList:
-    def test_success(self, user_client: CustomAPIClient, cart_factory, url_factory):
+    def test_success(
+        self,
+        user_client: CustomAPIClient,
+        cart_factory,
+        url_factory,
+        django_assert_max_num_queries,
+    ):
         cart_quantity = 2
         cart_factory(cart_quantity)
         cart: list[Cart] = cart_factory(cart_quantity, customer=user_client.orm_user_obj)
         url: str = url_factory("cart-list")
 
-        response: Response = user_client.get(url)
+        # Подсчет количества объектов для пагинации и выборка страницы
+        with django_assert_max_num_queries(2):
+            response: Response = user_client.get(url)
 
         assert response.status_code == 200
-        api_data: list[dict] = sorted_list_of_dicts_by_id(response.json()["results"])
-        db_data: list[dict] = sorted_list_of_dicts_by_id(CartSerializer(cart, many=True).data)
+        api_data: list[dict] = response.json()["results"]
+        db_data: list[dict] = CartSerializer(cart, many=True).data
         assert api_data == db_data
 
     def test_fail_unauthorized(self, anon_client: CustomAPIClient, url_factory):
@@ -35,13 +42,21 @@ class TestGetList:
 
 
 class TestGetDetail:
-    def test_success(self, user_client: CustomAPIClient, cart_factory, url_factory):
+    def test_success(
+        self,
+        user_client: CustomAPIClient,
+        cart_factory,
+        url_factory,
+        django_assert_max_num_queries,
+    ):
         cart_quantity = 2
         cart: list[Cart] = cart_factory(cart_quantity, customer=user_client.orm_user_obj)
         target_product: Cart = cart[0]
         url: str = url_factory("cart-detail", pk=target_product.id)
 
-        response: Response = user_client.get(url)
+        # Выборка товара в корзине вместе со связанными объектами
+        with django_assert_max_num_queries(1):
+            response: Response = user_client.get(url)
 
         assert response.status_code == 200
         api_data: dict = response.json()
@@ -166,82 +181,56 @@ class TestDelete:
 
 
 class TestConfirmOrder:
-    def test_success(
-        self, user_client: CustomAPIClient, cart_factory, contact_factory, url_factory
-    ):
-        cart_quantity = 2
-        user: User = user_client.orm_user_obj
-        cart_factory(cart_quantity, customer=user)
-        order_info = {"delivery_address": contact_factory(as_dict=True)}
-        url: str = url_factory("cart-confirm-order")
-
-        response: Response = user_client.post(url, data=order_info)
-
-        assert response.status_code == 201
-        api_data: list[dict] = sorted_list_of_dicts_by_id(response.json())
-        assert len(api_data) == cart_quantity
-        for order in api_data:
-            assert order["delivery_address"] == order_info["delivery_address"]
-            assert order["customer"] == user.email
-        orders: QuerySet[Order] = Order.objects.filter(customer=user)
-        db_data: list[dict] = sorted_list_of_dicts_by_id(OrderSerializer(orders, many=True).data)
-        assert api_data == db_data
-
-    def test_fail_empty_cart(
-        self, user_client: CustomAPIClient, cart_factory, contact_factory, url_factory
+    @pytest.mark.parametrize(
+        ["available_quantity", "unavailable_quantity", "expected_status"],
+        [
+            pytest.param(2, 0, 201, id="success"),
+            pytest.param(0, 0, 404, id="fail_empty_cart"),
+            pytest.param(2, 2, 201, id="fail_few_products_unavailable_for_order"),
+            pytest.param(0, 2, 409, id="fail_all_products_unavailable_for_order"),
+        ],
+    )
+    def test_confirm_order(
+        self,
+        user_client: CustomAPIClient,
+        cart_factory,
+        sample_contact_dict,
+        url_factory,
+        available_quantity: int,
+        unavailable_quantity: int,
+        expected_status: int,
     ):
-        order_info = {"delivery_address": contact_factory(as_dict=True)}
-        url: str = url_factory("cart-confirm-order")
-
-        response: Response = user_client.post(url, data=order_info)
-
-        assert response.status_code == 404
-
-    def test_fail_few_products_unavailable_for_order(
-        self, user_client: CustomAPIClient, cart_factory, contact_factory, url_factory
-    ):
-        cart_quantity = 2
         user: User = user_client.orm_user_obj
         unavailable_products: list[Cart] = cart_factory(
-            cart_quantity, customer=user, product__can_buy=False
+            unavailable_quantity, customer=user, product__can_buy=False, bulk=True
         )
-        cart_factory(cart_quantity, customer=user)
-        order_info = {"delivery_address": contact_factory(as_dict=True)}
+        cart_factory(available_quantity, customer=user, bulk=True)
+        order_info = {"delivery_address": sample_contact_dict}
         url: str = url_factory("cart-confirm-order")
 
         response: Response = user_client.post(url, data=order_info)
 
-        assert response.status_code == 201
-        api_data: list[dict] = sorted_list_of_dicts_by_id(response.json())
-        assert len(api_data) == cart_quantity
+        assert response.status_code == expected_status
+        if expected_status != 201:
+            return
+        api_data: list[dict] = response.json()
+        assert len(api_data) == available_quantity
         for order in api_data:
             assert order["delivery_address"] == order_info["delivery_address"]
             assert order["customer"] == user.email
         orders: QuerySet[Order] = Order.objects.filter(customer=user)
-        db_data: list[dict] = sorted_list_of_dicts_by_id(OrderSerializer(orders, many=True).data)
-        assert api_data == db_data
+        assert to_dict_minimal(api_data, ORDER_FIELDS) == to_dict_minimal(orders, ORDER_FIELDS)
         cart: QuerySet[Cart] = Cart.objects.filter(customer=user)
-        assert list(cart) == unavailable_products
-
-    def test_fail_all_products_unavailable_for_order(
-        self, user_client: CustomAPIClient, cart_factory, contact_factory, url_factory
-    ):
-        cart_quantity = 2
-        user: User = user_client.orm_user_obj
-        cart_factory(cart_quantity, customer=user, product__can_buy=False)
-        order_info = {"delivery_address": contact_factory(as_dict=True)}
-        url: str = url_factory("cart-confirm-order")
-
-        response: Response = user_client.post(url, data=order_info)
-
-        assert response.status_code == 409
+        assert set(cart.values_list("pk", flat=True)) == {
+            product.pk for product in unavailable_products
+        }
 
     def test_fail_no_delivery_address(
         self, user_client: CustomAPIClient, cart_factory, url_factory
     ):
         cart_quantity = 2
         user: User = user_client.orm_user_obj
-        cart_factory(cart_quantity, customer=user)
+        cart_factory(cart_quantity, customer=user, bulk=True)
         url: str = url_factory("cart-confirm-order")
 
         response: Response = user_client.post(url)
@@ -9,12 +9,22 @@ pytestmark = pytest.mark.django_db
 
 
 class TestGetList:
-    def test_success(self, user_client: CustomAPIClient, order_factory, url_factory):
+    def test_success(
+        self,
+        user_client: CustomAPIClient,
+        order_factory,
+        url_factory,
+        django_assert_max_num_queries,
+    ):
         orders_quantity = 3
-        orders: list[Order] = order_factory(orders_quantity, customer=user_client.orm_user_obj)
+        orders: list[Order] = order_factory(
+            orders_quantity, customer=user_client.orm_user_obj, bulk=True
+        )
         url: str = url_factory("order")
 
-        response: Response = user_client.get(url)
+        # Выборка страницы заказов и предзагрузка товаров на складе
+        with django_assert_max_num_queries(2):
+            response: Response = user_client.get(url)
 
         assert response.status_code == 200
         api_data: list[dict] = sorted_list_of_dicts_by_id(response.json()["results"])
@@ -22,16 +32,22 @@ class TestGetList:
         assert api_data == db_data
 
     def test_filter_by_status_success(
-        self, user_client: CustomAPIClient, order_factory, url_factory
+        self,
+        user_client: CustomAPIClient,
+        order_factory,
+        url_factory,
+        django_assert_max_num_queries,
     ):
         orders_quantity = 3
-        order_factory(orders_quantity, customer=user_client.orm_user_obj)
+        order_factory(orders_quantity, customer=user_client.orm_user_obj, bulk=True)
         assembled_orders: list[Order] = order_factory(
-            orders_quantity, customer=user_client.orm_user_obj, status="assembled"
+            orders_quantity, customer=user_client.orm_user_obj, status="assembled", bulk=True
         )
         url: str = f'{url_factory("order")}?status=assembled'
 
-        response: Response = user_client.get(url)
+        # Количество запросов не зависит от количества заказов
+        with django_assert_max_num_queries(2):
+            response: Response = user_client.get(url)
 
         assert response.status_code == 200
         api_data: list[dict] = sorted_list_of_dicts_by_id(response.json()["results"])
@@ -44,7 +60,7 @@ class TestGetList:
         self, user_client: CustomAPIClient, order_factory, url_factory
     ):
         orders_quantity = 3
-        order_factory(orders_quantity, customer=user_client.orm_user_obj)
+        order_factory(orders_quantity, customer=user_client.orm_user_obj, bulk=True)
         url: str = f'{url_factory("order")}?created_before=2025-03-31'
 
         response: Response = user_client.get(url)
@@ -1,48 +1,70 @@
+import functools
 import json
+from collections.abc import Callable
 
 import pytest
 import yaml
+from celery.result import EagerResult
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.mail import EmailMessage
-from django_celery_results.models import TaskResult
 from faker import Faker
 from rest_framework.response import Response
 
 from autopurchases.models import STATUS_CHOICES, Order, Product, Shop, Stock, User
 from autopurchases.serializers import OrderSerializer, ShopSerializer, StockSerializer
-from tests.utils import CustomAPIClient, sorted_list_of_dicts_by_id
+from autopurchases.tasks import import_shop
+from tests.utils import CustomAPIClient, assert_subset_by_frozen
 
 pytestmark = pytest.mark.django_db
 
+_DUMMY_BYTES = b"\0" * 64
+_STATUSES = tuple(STATUS_CHOICES.keys())
+_yaml_load = functools.partial(yaml.load, Loader=yaml.CSafeLoader)
+
 
 class TestGetList:
-    def test_success(self, user_client: CustomAPIClient, shop_factory, url_factory):
+    def test_success(
+        self,
+        user_client: CustomAPIClient,
+        shop_factory,
+        url_factory,
+        django_assert_max_num_queries,
+    ):
         shops_quantity = 5
-        shops: list[Shop] = shop_factory(shops_quantity)
+        shops: list[Shop] = shop_factory(shops_quantity, bulk=True)
         url: str = url_factory("shop-list")
 
-        response: Response = user_client.get(url)
+        # Подсчет количества объектов для пагинации, выборка страницы и предзагрузка менеджеров
+        with django_assert_max_num_queries(3):
+            response: Response = user_client.get(url)
 
         assert response.status_code == 200
         api_data: list[dict] = response.json()
         assert api_data["count"] == shops_quantity
         db_data: list[dict] = ShopSerializer(shops, many=True).data
-        for shop_info in api_data["results"]:
-            assert shop_info in db_data
+        assert_subset_by_frozen(api_data["results"], db_data)
 
-    def test_unauthorized_success(self, anon_client: CustomAPIClient, shop_factory, url_factory):
+    def test_unauthorized_success(
+        self,
+        anon_client: CustomAPIClient,
+        shop_factory,
+        url_factory,
+        django_assert_max_num_queries,
+    ):
         shops_quantity = 5
-        shops: list[Shop] = shop_factory(shops_quantity)
+        shops: list[Shop] = shop_factory(shops_quantity, bulk=True)
         url: str = url_factory("shop-list")
 
-        response: Response = anon_client.get(url)
+        # Подсчет количества объектов для пагинации, выборка страницы и предзагрузка менеджеров
+        with django_assert_max_num_queries(3):
+            response: Response = anon_client.get(url)
 
         assert response.status_code == 200
         api_data: list[dict] = response.json()
         assert api_data["count"] == shops_quantity
         db_data: list[dict] = ShopSerializer(shops, many=True).data
-        for shop_info in api_data["results"]:
-            assert shop_info in db_data
+        assert_subset_by_frozen(api_data["results"], db_data)
 
 
 class TestGetDetail:
@@ -74,25 +96,25 @@ class TestPost:
         shop_info: dict = shop_factory(as_dict=True)
         url: str = url_factory("shop-list")
 
-        response: Response = user_client.post(url, data=shop_info)
+        response: Response = user_client.post_json(url, shop_info)
 
         assert response.status_code == 201
         api_data: dict = response.json()
         assert api_data["name"] == shop_info["name"]
         assert len(api_data["managers"]) == 1
         assert user_client.orm_user_obj.id in api_data["managers"]
-        assert user_client.orm_user_obj.shops.all()[0].name == shop_info["name"]
+        assert user_client.orm_user_obj.shops.filter(name=shop_info["name"]).exists()
 
     def test_with_managers_success(
         self, user_client: CustomAPIClient, shop_factory, user_factory, url_factory
     ):
         users_quantity = 2
-        users: list[User] = user_factory(users_quantity)
+        users: list[User] = user_factory(users_quantity, bulk=True)
         shop_info: dict = shop_factory(as_dict=True)
         shop_info["managers"] = [user.id for user in users]
         url: str = url_factory("shop-list")
 
-        response: Response = user_client.post(url, data=shop_info)
+        response: Response = user_client.post_json(url, shop_info)
 
         assert response.status_code == 201
         api_data: dict = response.json()
@@ -101,13 +123,13 @@ class TestPost:
         users.append(user_client.orm_user_obj)
         for user in users:
             assert user.id in api_data["managers"]
-            assert user.shops.all()[0].name == shop_info["name"]
+            assert user.shops.filter(name=shop_info["name"]).exists()
 
     def test_fail_unauthorized(self, anon_client: CustomAPIClient, shop_factory, url_factory):
         shop_info: dict = shop_factory(as_dict=True)
         url: str = url_factory("shop-list")
 
-        response: Response = anon_client.post(url, data=shop_info)
+        response: Response = anon_client.post_json(url, shop_info)
 
         assert response.status_code == 401
 
@@ -116,7 +138,7 @@ class TestPost:
         shop_factory(**shop_info)
         url: str = url_factory("shop-list")
 
-        response: Response = user_client.post(url, data=shop_info)
+        response: Response = user_client.post_json(url, shop_info)
 
         assert response.status_code == 400
 
@@ -134,7 +156,7 @@ class TestPatch:
         shop_info = {"name": faker.word()}
         url: str = url_factory("shop-detail", slug=shop.slug)
 
-        response: Response = user_client.patch(url, data=shop_info)
+        response: Response = user_client.patch_json(url, shop_info)
 
         assert response.status_code == 200
         api_data: dict = response.json()
@@ -149,33 +171,33 @@ class TestPatch:
         shop_info = {"name": faker.word()}
         url: str = url_factory("shop-detail", slug=shop.slug)
 
-        response: Response = admin_client.patch(url, data=shop_info)
+        response: Response = admin_client.patch_json(url, shop_info)
 
         assert response.status_code == 200
         api_data: dict = response.json()
-        shop.refresh_from_db(fields=["name"])
-        assert api_data["name"] == shop_info["name"] == shop.name
+        assert api_data["name"] == shop_info["name"]
 
     def test_with_managers_success(
         self, user_client: CustomAPIClient, shop_factory, user_factory, url_factory
     ):
         users_quantity = 2
-        users: list[User] = user_factory(users_quantity)
+        users: list[User] = user_factory(users_quantity, bulk=True)
         shop: Shop = shop_factory(
             managers__manager=user_client.orm_user_obj, managers__is_owner=True
         )
         shop_info = {"managers": [user.id for user in users]}
         url: str = url_factory("shop-detail", slug=shop.slug)
 
-        response: Response = user_client.patch(url, data=shop_info)
+        response: Response = user_client.patch_json(url, shop_info)
 
         assert response.status_code == 200
         api_data: dict = response.json()
+        assert api_data["name"] == shop.name
         assert len(api_data["managers"]) == users_quantity + 1
         users.append(user_client.orm_user_obj)
         for user in users:
             assert user.id in api_data["managers"]
-            assert user.shops.all()[0].name == api_data["name"] == shop.name
+            assert user.shops.filter(name=shop.name).exists()
 
     def test_fail_unauthorized(
         self, anon_client: CustomAPIClient, faker: Faker, shop_factory, url_factory
@@ -184,7 +206,7 @@ class TestPatch:
         shop_info = {"name": faker.word()}
         url: str = url_factory("shop-detail", slug=shop.slug)
 
-        response: Response = anon_client.patch(url, data=shop_info)
+        response: Response = anon_client.patch_json(url, shop_info)
 
         assert response.status_code == 401
 
@@ -195,7 +217,7 @@ class TestPatch:
         shop_info = {"name": faker.word()}
         url: str = url_factory("shop-detail", slug=shop.slug)
 
-        response: Response = user_client.patch(url, data=shop_info)
+        response: Response = user_client.patch_json(url, shop_info)
 
         assert response.status_code == 403
 
@@ -238,74 +260,88 @@ class TestDelete:
 
 
 class TestImport:
-    def test_yaml_in_body_success(self, user_client: CustomAPIClient, url_factory):
-        with open("tests/test_data/shop_data.yaml", encoding="utf-8") as fr:
-            shop_info: dict = yaml.safe_load(fr)
-        products_quantity = len(shop_info["products"])
-        shop_name = shop_info["shop"]
-        url: str = url_factory("shop-import")
-
-        response: Response = user_client.post(url, data=shop_info, content_type="application/yaml")
-
-        assert response.status_code == 200
-        api_data: dict = response.json()
-        task: TaskResult = TaskResult.objects.get(task_id=api_data["task_id"])
-        assert Shop.objects.filter(name=shop_name).first().name == shop_name
-        assert Product.objects.count() == products_quantity
-        assert task.status == "SUCCESS"
-
-    def test_json_in_body_success(self, user_client: CustomAPIClient, url_factory):
-        with open("tests/test_data/shop_data.json", encoding="utf-8") as fr:
-            shop_info: dict[str, str | list[dict]] = json.load(fr)
+    @pytest.mark.parametrize(
+        ["data_fixture", "request_kwargs"],
+        [
+            pytest.param("shop_yaml_dict", {"content_type": "application/yaml"}, id="yaml"),
+            pytest.param("shop_json_dict", {}, id="json"),
+        ],
+    )
+    def test_in_body_success(
+        self,
+        request: pytest.FixtureRequest,
+        user_client: CustomAPIClient,
+        url_factory,
+        data_fixture: str,
+        request_kwargs: dict,
+    ):
+        shop_info: dict[str, str | list[dict]] = request.getfixturevalue(data_fixture)
         products_quantity = len(shop_info["products"])
         shop_name = shop_info["shop"]
         url: str = url_factory("shop-import")
 
-        response: Response = user_client.post(url, data=shop_info)
+        response: Response = user_client.post(url, data=shop_info, **request_kwargs)
 
         assert response.status_code == 200
         api_data: dict = response.json()
-        task = TaskResult.objects.get(task_id=api_data["task_id"])
-        assert Shop.objects.filter(name=shop_name).first().name == shop_name
-        assert Product.objects.count() == products_quantity
-        assert task.status == "SUCCESS"
-
-    def test_file_yaml_in_body_success(self, user_client: CustomAPIClient, url_factory):
-        with open("tests/test_data/shop_data.yaml", "rb") as fr:
-            file = SimpleUploadedFile("shop_data.yaml", fr.read(), "application/yaml")
+        assert Shop.objects.filter(name=shop_name).exists()
+        assert Product.objects.filter(shops__name=shop_name).count() == products_quantity
+        assert api_data["status"] == "SUCCESS"
+
+    @pytest.mark.parametrize(
+        ["data_fixture", "file_name", "content_type"],
+        [
+            pytest.param("shop_yaml_bytes", "shop_data.yaml", "application/yaml", id="yaml"),
+            pytest.param("shop_json_bytes", "shop_data.json", "application/json", id="json"),
+        ],
+    )
+    def test_file_in_body_success(
+        self,
+        request: pytest.FixtureRequest,
+        user_client: CustomAPIClient,
+        url_factory,
+        data_fixture: str,
+        file_name: str,
+        content_type: str,
+    ):
+        file = SimpleUploadedFile(file_name, request.getfixturevalue(data_fixture), content_type)
         url: str = url_factory("shop-import")
 
         response: Response = user_client.post(url, data={"file": file}, format="multipart")
 
         assert response.status_code == 200
         api_data: dict = response.json()
-        task = TaskResult.objects.get(task_id=api_data["task_id"])
-        assert task.status == "SUCCESS"
+        assert api_data["status"] == "SUCCESS"
+
+    @pytest.mark.parametrize(
+        ["data", "content_type"],
+        [
+            pytest.param(b'{"shop": ', "application/json", id="json"),
+            pytest.param(b"shop: [", "application/yaml", id="yaml"),
+        ],
+    )
+    def test_fail_malformed_data(
+        self, user_client: CustomAPIClient, data: bytes, content_type: str
+    ):
+        user_id: int = user_client.orm_user_obj.id
 
-    def test_file_json_in_body_success(self, user_client: CustomAPIClient, url_factory):
-        with open("tests/test_data/shop_data.json", "rb") as fr:
-            file = SimpleUploadedFile("shop_data.json", fr.read(), "application/json")
-        url: str = url_factory("shop-import")
+        result: EagerResult = import_shop.apply(
+            kwargs={"data": data, "content_type": content_type, "user_id": user_id}, throw=False
+        )
 
-        response: Response = user_client.post(url, data={"file": file}, format="multipart")
+        assert result.status == "FAILURE"
+        assert not Shop.objects.exists()
 
-        assert response.status_code == 200
-        api_data: dict = response.json()
-        task = TaskResult.objects.get(task_id=api_data["task_id"])
-        assert task.status == "SUCCESS"
-
-    def test_fail_unauthorized(self, anon_client: CustomAPIClient, faker: Faker, url_factory):
-        file = SimpleUploadedFile("shop_data.yaml", faker.binary(length=64), "application/yaml")
+    def test_fail_unauthorized(self, anon_client: CustomAPIClient, url_factory):
+        file = SimpleUploadedFile("shop_data.yaml", _DUMMY_BYTES, "application/yaml")
         url: str = url_factory("shop-import")
 
         response: Response = anon_client.post(url, data={"file": file}, format="multipart")
 
         assert response.status_code == 401
 
-    def test_fail_invalid_content_type(
-        self, user_client: CustomAPIClient, faker: Faker, url_factory
-    ):
-        file = SimpleUploadedFile("shop_data.yaml", faker.binary(length=64), "application/yaml")
+    def test_fail_invalid_content_type(self, user_client: CustomAPIClient, url_factory):
+        file = SimpleUploadedFile("shop_data.yaml", _DUMMY_BYTES, "application/yaml")
         url: str = url_factory("shop-import")
 
         response: Response = user_client.post(
@@ -321,11 +357,9 @@ class TestImport:
 
         assert response.status_code == 400
 
-    def test_fail_no_file_content_type(
-        self, user_client: CustomAPIClient, faker: Faker, url_factory
-    ):
+    def test_fail_no_file_content_type(self, user_client: CustomAPIClient, url_factory):
         url: str = url_factory("shop-import")
-        file = SimpleUploadedFile("shop_data.yaml", faker.binary(length=64))
+        file = SimpleUploadedFile("shop_data.yaml", _DUMMY_BYTES)
 
         response: Response = user_client.post(url, data={"file": file}, format="multipart")
 
@@ -333,11 +367,27 @@ class TestImport:
 
 
 class TestExport:
-    def test_yaml_success(
-        self, user_client: CustomAPIClient, shop_factory, stock_factory, url_factory
+    @pytest.mark.parametrize(
+        ["headers", "content_type", "loader"],
+        [
+            pytest.param({}, "application/yaml", _yaml_load, id="yaml"),
+            pytest.param(
+                {"Accept": "application/json"}, "application/json", json.loads, id="json"
+            ),
+        ],
+    )
+    def test_success(
+        self,
+        user_client: CustomAPIClient,
+        shop_factory,
+        stock_factory,
+        url_factory,
+        headers: dict,
+        content_type: str,
+        loader: Callable[[bytes], dict],
     ):
         shop: Shop = shop_factory(managers__manager=user_client.orm_user_obj)
-        stock: list[Stock] = stock_factory(2, shop=shop)
+        stock: list[Stock] = stock_factory(2, shop=shop, bulk=True)
         products_db_data: list[dict] = [
             {key: value for key, value in product.items() if key != "shop"}
             for product in StockSerializer(stock, many=True).data
@@ -348,50 +398,70 @@ class TestExport:
 
         assert response.status_code == 200
         api_data: dict = response.json()
-        task = TaskResult.objects.get(task_id=api_data["task_id"])
-        assert task.status == "SUCCESS"
+        assert api_data["status"] == "SUCCESS"
 
         url: str = url_factory("download-file", task_id=api_data["task_id"])
 
-        response: Response = user_client.get(url)
+        response: Response = user_client.get(url, headers=headers)
 
         assert response.status_code == 200
         assert "Content-Disposition" in response.headers
         assert "attachment; filename=" in response.headers["Content-Disposition"]
-        assert response.accepted_media_type == "application/yaml"
-        api_data: dict = yaml.safe_load(response.content)
+        assert response.headers["Content-Type"] == content_type
+        api_data: dict = loader(response.getvalue())
         assert api_data["shop"] == shop.name
         assert api_data["products"] == products_db_data
 
-    def test_json_success(
-        self, user_client: CustomAPIClient, shop_factory, stock_factory, url_factory
+    def test_tasks_status_success(
+        self, user_client: CustomAPIClient, faker: Faker, shop_factory, url_factory
     ):
         shop: Shop = shop_factory(managers__manager=user_client.orm_user_obj)
-        stock: list[Stock] = stock_factory(2, shop=shop)
-        products_db_data: list[dict] = [
-            {key: value for key, value in product.items() if key != "shop"}
-            for product in StockSerializer(stock, many=True).data
-        ]
         url: str = url_factory("shop-export", slug=shop.slug)
+        task_id: str = user_client.get(url).json()["task_id"]
+        unknown_task_id: str = faker.uuid4()
+        url: str = f'{url_factory("celery-results")}?task_ids={task_id},{unknown_task_id}'
 
         response: Response = user_client.get(url)
 
         assert response.status_code == 200
-        api_data: dict = response.json()
-        task = TaskResult.objects.get(task_id=api_data["task_id"])
-        assert task.status == "SUCCESS"
+        api_data: list[dict] = response.json()
+        assert [task["task_id"] for task in api_data] == [task_id, unknown_task_id]
+        assert api_data[0]["status"] == "SUCCESS"
+        assert api_data[0]["link"].endswith(url_factory("download-file", task_id=task_id))
+        assert api_data[1] == {"task_id": unknown_task_id, "status": "PENDING"}
 
-        url: str = url_factory("download-file", task_id=api_data["task_id"])
+    def test_download_fail_unknown_task(
+        self, user_client: CustomAPIClient, faker: Faker, url_factory
+    ):
+        url: str = url_factory("download-file", task_id=faker.uuid4())
 
-        response: Response = user_client.get(url, headers={"Accept": "application/json"})
+        response: Response = user_client.get(url)
 
-        assert response.status_code == 200
-        assert "Content-Disposition" in response.headers
-        assert "attachment; filename=" in response.headers["Content-Disposition"]
-        assert response.accepted_media_type == "application/json"
-        api_data: dict = response.json()
-        assert api_data["shop"] == shop.name
-        assert api_data["products"] == products_db_data
+        assert response.status_code == 404
+
+    def test_download_fail_import_task(
+        self, user_client: CustomAPIClient, shop_json_bytes: bytes, url_factory
+    ):
+        url: str = url_factory("shop-import")
+        task_id: str = user_client.generic(
+            "POST", url, shop_json_bytes, "application/json"
+        ).json()["task_id"]
+        url: str = url_factory("download-file", task_id=task_id)
+
+        response: Response = user_client.get(url)
+
+        assert response.status_code == 409
+
+    def test_tasks_status_fail_too_many_ids(
+        self, user_client: CustomAPIClient, faker: Faker, url_factory, settings
+    ):
+        settings.MAX_TASK_IDS_PER_REQUEST = 2
+        task_ids: str = ",".join(faker.uuid4() for _ in range(3))
+        url: str = f'{url_factory("celery-results")}?task_ids={task_ids}'
+
+        response: Response = user_client.get(url)
+
+        assert response.status_code == 400
 
     def test_admin_success(self, admin_client: CustomAPIClient, shop_factory, url_factory):
         shop: Shop = shop_factory()
@@ -401,8 +471,7 @@ class TestExport:
 
         assert response.status_code == 200
         api_data: dict = response.json()
-        task = TaskResult.objects.get(task_id=api_data["task_id"])
-        assert task.status == "SUCCESS"
+        assert api_data["status"] == "SUCCESS"
 
     def test_fail_unauthorized(self, anon_client: CustomAPIClient, shop_factory, url_factory):
         shop: Shop = shop_factory(no_managers=True)
@@ -422,44 +491,64 @@ class TestExport:
 
 
 class TestGetOrders:
-    def test_success(self, user_client: CustomAPIClient, shop_factory, order_factory, url_factory):
+    def test_success(
+        self,
+        user_client: CustomAPIClient,
+        shop_factory,
+        order_factory,
+        url_factory,
+        django_assert_num_queries,
+    ):
         orders_quantity = 2
         shop: Shop = shop_factory(managers__manager=user_client.orm_user_obj)
-        orders: list[Order] = order_factory(orders_quantity, product__shop=shop)
+        orders: list[Order] = order_factory(orders_quantity, product__shop=shop, bulk=True)
+        url: str = url_factory("shop-get-orders", slug=shop.slug)
+
+        # Выборка магазина и его менеджеров, выборка страницы заказов (курсорная пагинация,
+        # без подсчета количества) и предзагрузка товаров на складе
+        with django_assert_num_queries(4):
+            response: Response = user_client.get(url)
+
+        assert response.status_code == 200
+        assert {order["id"] for order in response.json()["results"]} == {
+            order.id for order in orders
+        }
+
+    def test_order_serialization_shape(
+        self, user_client: CustomAPIClient, shop_factory, order_factory, url_factory
+    ):
+        shop: Shop = shop_factory(managers__manager=user_client.orm_user_obj)
+        order: Order = order_factory(product__shop=shop)
         url: str = url_factory("shop-get-orders", slug=shop.slug)
 
         response: Response = user_client.get(url)
 
         assert response.status_code == 200
-        api_data: list[dict] = sorted_list_of_dicts_by_id(response.json()["results"])
-        db_data: list[dict] = sorted_list_of_dicts_by_id(OrderSerializer(orders, many=True).data)
-        assert api_data == db_data
+        assert response.json()["results"] == [OrderSerializer(order).data]
 
     def test_filter_by_status_success(
         self, user_client: CustomAPIClient, shop_factory, order_factory, url_factory
     ):
         orders_quantity = 2
         shop: Shop = shop_factory(managers__manager=user_client.orm_user_obj)
-        order_factory(orders_quantity, product__shop=shop)
+        order_factory(orders_quantity, product__shop=shop, bulk=True)
         assembled_orders: list[Order] = order_factory(
-            orders_quantity, product__shop=shop, status="assembled"
+            orders_quantity, product__shop=shop, status="assembled", bulk=True
         )
         url: str = f'{url_factory("shop-get-orders", slug=shop.slug)}?status=assembled'
 
         response: Response = user_client.get(url)
 
         assert response.status_code == 200
-        api_data: list[dict] = sorted_list_of_dicts_by_id(response.json()["results"])
-        db_data: list[dict] = sorted_list_of_dicts_by_id(
-            OrderSerializer(assembled_orders, many=True).data
-        )
-        assert api_data == db_data
+        assert {order["id"] for order in response.json()["results"]} == {
+            order.id for order in assembled_orders
+        }
 
     def test_filter_by_created_at_success(
         self, user_client: CustomAPIClient, shop_factory, order_factory, url_factory
     ):
         shop: Shop = shop_factory(managers__manager=user_client.orm_user_obj)
-        order_factory(2, product__shop=shop)
+        order_factory(2, product__shop=shop, bulk=True)
         url: str = f'{url_factory("shop-get-orders", slug=shop.slug)}?created_before=2025-03-31'
 
         response: Response = user_client.get(url)
@@ -472,15 +561,15 @@ class TestGetOrders:
     ):
         orders_quantity = 2
         shop: Shop = shop_factory()
-        orders: list[Order] = order_factory(orders_quantity, product__shop=shop)
+        orders: list[Order] = order_factory(orders_quantity, product__shop=shop, bulk=True)
         url: str = url_factory("shop-get-orders", slug=shop.slug)
 
         response: Response = admin_client.get(url)
 
         assert response.status_code == 200
-        api_data: list[dict] = sorted_list_of_dicts_by_id(response.json()["results"])
-        db_data: list[dict] = sorted_list_of_dicts_by_id(OrderSerializer(orders, many=True).data)
-        assert api_data == db_data
+        assert {order["id"] for order in response.json()["results"]} == {
+            order.id for order in orders
+        }
 
     def test_fail_unauthorized(self, anon_client: CustomAPIClient, shop_factory, url_factory):
         shop: Shop = shop_factory()
@@ -508,7 +597,7 @@ class TestPatchProductInStock:
         stock_info = {"quantity": faker.pyint(), "can_buy": faker.pybool()}
         url: str = url_factory("shop-update-product-in-stock", slug=shop.slug, stock_pk=stock.id)
 
-        response: Response = user_client.patch(url, data=stock_info)
+        response: Response = user_client.patch_json(url, stock_info)
 
         assert response.status_code == 200
         api_data: dict = response.json()
@@ -516,6 +605,36 @@ class TestPatchProductInStock:
         assert api_data["quantity"] == stock_info["quantity"] == stock.quantity
         assert api_data["can_buy"] == stock_info["can_buy"] == stock.can_buy
 
+    def test_success_invalidates_stock_cache(
+        self,
+        user_client: CustomAPIClient,
+        settings,
+        shop_factory,
+        stock_factory,
+        url_factory,
+        django_capture_on_commit_callbacks,
+    ):
+        settings.CACHES = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "stock-cache-test",
+            }
+        }
+        cache.clear()
+        shop: Shop = shop_factory(managers__manager=user_client.orm_user_obj)
+        stock: Stock = stock_factory(shop=shop)
+        stock_list_url: str = url_factory("stock")
+        assert user_client.get(stock_list_url).json()["results"][0]["quantity"] == stock.quantity
+        new_quantity: int = stock.quantity + 1
+        url: str = url_factory("shop-update-product-in-stock", slug=shop.slug, stock_pk=stock.id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response: Response = user_client.patch_json(url, {"quantity": new_quantity})
+
+        assert response.status_code == 200
+        response: Response = user_client.get(stock_list_url)
+        assert response.json()["results"][0]["quantity"] == new_quantity
+
     def test_admin_success(
         self, admin_client: CustomAPIClient, faker: Faker, shop_factory, stock_factory, url_factory
     ):
@@ -524,13 +643,12 @@ class TestPatchProductInStock:
         stock_info = {"quantity": faker.pyint(), "can_buy": faker.pybool()}
         url: str = url_factory("shop-update-product-in-stock", slug=shop.slug, stock_pk=stock.id)
 
-        response: Response = admin_client.patch(url, data=stock_info)
+        response: Response = admin_client.patch_json(url, stock_info)
 
         assert response.status_code == 200
         api_data: dict = response.json()
-        stock.refresh_from_db(fields=["quantity", "can_buy"])
-        assert api_data["quantity"] == stock_info["quantity"] == stock.quantity
-        assert api_data["can_buy"] == stock_info["can_buy"] == stock.can_buy
+        assert api_data["quantity"] == stock_info["quantity"]
+        assert api_data["can_buy"] == stock_info["can_buy"]
 
     def test_fail_unauthorized(
         self, anon_client: CustomAPIClient, shop_factory, stock_factory, url_factory
@@ -550,7 +668,7 @@ class TestPatchProductInStock:
         stock_info = {"quantity": faker.pyint(), "can_buy": faker.pybool()}
         url: str = url_factory("shop-update-product-in-stock", slug=shop.slug, stock_pk=1)
 
-        response: Response = user_client.patch(url, data=stock_info)
+        response: Response = user_client.patch_json(url, stock_info)
 
         assert response.status_code == 400
 
@@ -563,7 +681,7 @@ class TestPatchProductInStock:
 
         url: str = url_factory("shop-update-product-in-stock", slug=shop.slug, stock_pk=stock.id)
 
-        response: Response = user_client.patch(url, data=stock_info)
+        response: Response = user_client.patch_json(url, stock_info)
 
         assert response.status_code == 403
 
@@ -576,15 +694,17 @@ class TestPatchOrderStatus:
         shop_factory,
         order_factory,
         url_factory,
-        transactional_db,
         mailoutbox,
+        django_capture_on_commit_callbacks,
     ):
         shop: Shop = shop_factory(managers__manager=user_client.orm_user_obj)
         order: Order = order_factory(product__shop=shop)
-        order_info = {"status": faker.random_element(STATUS_CHOICES.keys())}
+        order_info = {"status": faker.random_element(_STATUSES)}
         url: str = url_factory("shop-update-order", slug=shop.slug, order_pk=order.id)
 
-        response: Response = user_client.patch(url, data=order_info)
+        # Письмо отправляется после фиксации транзакции (delay_on_commit)
+        with django_capture_on_commit_callbacks(execute=True):
+            response: Response = user_client.patch_json(url, order_info)
 
         assert response.status_code == 200
         api_data: dict = response.json()
@@ -601,20 +721,21 @@ class TestPatchOrderStatus:
         shop_factory,
         order_factory,
         url_factory,
-        transactional_db,
         mailoutbox,
+        django_capture_on_commit_callbacks,
     ):
         shop: Shop = shop_factory()
         order: Order = order_factory(product__shop=shop)
-        order_info = {"status": faker.random_element(STATUS_CHOICES.keys())}
+        order_info = {"status": faker.random_element(_STATUSES)}
         url: str = url_factory("shop-update-order", slug=shop.slug, order_pk=order.id)
 
-        response: Response = admin_client.patch(url, data=order_info)
+        # Письмо отправляется после фиксации транзакции (delay_on_commit)
+        with django_capture_on_commit_callbacks(execute=True):
+            response: Response = admin_client.patch_json(url, order_info)
 
         assert response.status_code == 200
         api_data: dict = response.json()
-        order.refresh_from_db(fields=["status"])
-        assert api_data["status"] == order_info["status"] == order.status
+        assert api_data["status"] == order_info["status"]
         assert len(mailoutbox) == 1
         msg: EmailMessage = mailoutbox[0]
         assert msg.to == [order.customer.email]
@@ -624,10 +745,10 @@ class TestPatchOrderStatus:
     ):
         shop: Shop = shop_factory()
         order: Order = order_factory(product__shop=shop)
-        order_info = {"status": faker.random_element(STATUS_CHOICES.keys())}
+        order_info = {"status": faker.random_element(_STATUSES)}
         url: str = url_factory("shop-update-order", slug=shop.slug, order_pk=order.id)
 
-        response: Response = anon_client.patch(url, data=order_info)
+        response: Response = anon_client.patch_json(url, order_info)
 
         assert response.status_code == 401
 
@@ -636,10 +757,10 @@ class TestPatchOrderStatus:
     ):
         shop: Shop = shop_factory()
         order: Order = order_factory(product__shop=shop)
-        order_info = {"status": faker.random_element(STATUS_CHOICES.keys())}
+        order_info = {"status": faker.random_element(_STATUSES)}
         url: str = url_factory("shop-update-order", slug=shop.slug, order_pk=order.id)
 
-        response: Response = user_client.patch(url, data=order_info)
+        response: Response = user_client.patch_json(url, order_info)
 
         assert response.status_code == 403
 
@@ -651,7 +772,7 @@ class TestPatchOrderStatus:
         order_info = {"status": "invalid_status"}
         url: str = url_factory("shop-update-order", slug=shop.slug, order_pk=order.id)
 
-        response: Response = user_client.patch(url, data=order_info)
+        response: Response = user_client.patch_json(url, order_info)
 
         assert response.status_code == 400
 
@@ -667,11 +788,11 @@ class TestPatchOrderStatus:
         shop: Shop = shop_factory(managers__manager=user_client.orm_user_obj)
         order: Order = order_factory(product__shop=shop)
         order_info = {
-            "status": faker.random_element(STATUS_CHOICES.keys()),
+            "status": faker.random_element(_STATUSES),
             "delivery_address": contact_factory(as_dict=True),
         }
         url: str = url_factory("shop-update-order", slug=shop.slug, order_pk=order.id)
 
-        response: Response = user_client.patch(url, data=order_info)
+        response: Response = user_client.patch_json(url, order_info)
 
         assert response.status_code == 400
@@ -1,10 +1,13 @@
+import operator
+
 import pytest
+from django.core.cache import cache
 from faker import Faker
 from rest_framework.response import Response
 
 from autopurchases.models import Stock
 from autopurchases.serializers import StockSerializer
-from tests.utils import CustomAPIClient, sorted_list_of_dicts_by_id
+from tests.utils import CustomAPIClient, assert_same_by_id
 
 pytestmark = pytest.mark.django_db
 
@@ -12,193 +15,145 @@ pytestmark = pytest.mark.django_db
 class TestGetList:
     def test_success(self, anon_client: CustomAPIClient, stock_factory, url_factory):
         stock_quantity = 5
-        products: list[Stock] = stock_factory(stock_quantity)
+        products: list[Stock] = stock_factory(stock_quantity, bulk=True)
         url: str = url_factory("stock")
 
         response: Response = anon_client.get(url)
 
         assert response.status_code == 200
-        api_data: list[dict] = sorted_list_of_dicts_by_id(response.json()["results"])
-        db_data: list[dict] = sorted_list_of_dicts_by_id(StockSerializer(products, many=True).data)
-        assert api_data == db_data
+        assert_same_by_id(response.json()["results"], StockSerializer(products, many=True).data)
 
     def test_filter_by_price_success(
         self, anon_client: CustomAPIClient, faker: Faker, stock_factory, url_factory
     ):
         stock_quantity = 3
-        stock_factory(stock_quantity, price=faker.pyint(max_value=500, min_value=1))
-        products: list[Stock] = stock_factory(stock_quantity, price=faker.pyint(min_value=501))
+        stock_factory(stock_quantity, price=faker.pyint(max_value=500, min_value=1), bulk=True)
+        products: list[Stock] = stock_factory(
+            stock_quantity, price=faker.pyint(min_value=501), bulk=True
+        )
         url: str = f'{url_factory("stock")}?price_min=501'
 
         response: Response = anon_client.get(url)
 
         assert response.status_code == 200
-        api_data: list[dict] = sorted_list_of_dicts_by_id(response.json()["results"])
-        db_data: list[dict] = sorted_list_of_dicts_by_id(StockSerializer(products, many=True).data)
-        assert api_data == db_data
+        assert_same_by_id(response.json()["results"], StockSerializer(products, many=True).data)
 
     def test_filter_by_quantity_success(
         self, anon_client: CustomAPIClient, faker: Faker, stock_factory, url_factory
     ):
         stock_quantity = 3
-        stock_factory(stock_quantity, quantity=faker.pyint(max_value=50, min_value=1))
+        stock_factory(stock_quantity, quantity=faker.pyint(max_value=50, min_value=1), bulk=True)
         products: list[Stock] = stock_factory(
-            stock_quantity, quantity=faker.pyint(min_value=51, max_value=100)
+            stock_quantity, quantity=faker.pyint(min_value=51, max_value=100), bulk=True
         )
-        stock_factory(stock_quantity, quantity=faker.pyint(min_value=101))
+        stock_factory(stock_quantity, quantity=faker.pyint(min_value=101), bulk=True)
         url: str = f'{url_factory("stock")}?quantity_min=51&quantity_max=100'
 
         response: Response = anon_client.get(url)
 
         assert response.status_code == 200
-        api_data: list[dict] = sorted_list_of_dicts_by_id(response.json()["results"])
-        db_data: list[dict] = sorted_list_of_dicts_by_id(StockSerializer(products, many=True).data)
-        assert api_data == db_data
+        assert_same_by_id(response.json()["results"], StockSerializer(products, many=True).data)
 
-    def test_filter_by_model_success(
-        self, anon_client: CustomAPIClient, stock_factory, url_factory
+    def test_success_cache_unavailable(
+        self, anon_client: CustomAPIClient, stock_factory, url_factory, monkeypatch
     ):
-        stock_quantity = 3
-        products: list[Stock] = stock_factory(stock_quantity)
-        target_product: Stock = products[0]
-        url: str = f'{url_factory("stock")}?model={target_product.product.model}'
-
-        response: Response = anon_client.get(url)
-
-        assert response.status_code == 200
-        api_data: list[dict] = response.json()["results"]
-        db_data: list[dict] = StockSerializer(target_product).data
-        assert api_data == [db_data]
+        def cache_unavailable(url: str):
+            raise ConnectionError("cache is unavailable")
 
-    def test_filter_by_name_success(self, anon_client: CustomAPIClient, stock_factory, url_factory):
-        stock_quantity = 3
-        products: list[Stock] = stock_factory(stock_quantity)
-        target_product: Stock = products[0]
-        url: str = f'{url_factory("stock")}?name={target_product.product.name}'
+        monkeypatch.setattr("autopurchases.cache.get_stock_cache_key", cache_unavailable)
+        products: list[Stock] = stock_factory(2, bulk=True)
+        url: str = url_factory("stock")
 
         response: Response = anon_client.get(url)
 
         assert response.status_code == 200
-        api_data: list[dict] = response.json()["results"]
-        db_data: list[dict] = StockSerializer(target_product).data
-        assert api_data == [db_data]
-
-    def test_filter_by_category_success(
-        self, anon_client: CustomAPIClient, stock_factory, url_factory
+        assert_same_by_id(response.json()["results"], StockSerializer(products, many=True).data)
+
+    def test_shop_rename_invalidates_cache(
+        self,
+        anon_client: CustomAPIClient,
+        settings,
+        stock_factory,
+        url_factory,
+        django_capture_on_commit_callbacks,
     ):
-        stock_quantity = 3
-        products: list[Stock] = stock_factory(stock_quantity)
-        target_product: Stock = products[0]
-        url: str = f'{url_factory("stock")}?category={target_product.product.category.name}'
-
-        response: Response = anon_client.get(url)
-
-        assert response.status_code == 200
-        api_data: list[dict] = response.json()["results"]
-        db_data: list[dict] = StockSerializer(target_product).data
-        assert api_data == [db_data]
+        settings.CACHES = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "stock-cache-test",
+            }
+        }
+        cache.clear()
+        stock: Stock = stock_factory()
+        url: str = url_factory("stock")
+        assert anon_client.get(url).json()["results"][0]["shop"] == stock.shop.name
+        new_name = f"{stock.shop.name}-renamed"
 
-    def test_filter_by_shop_success(self, anon_client: CustomAPIClient, stock_factory, url_factory):
-        stock_quantity = 3
-        products: list[Stock] = stock_factory(stock_quantity)
-        target_product: Stock = products[0]
-        url: str = f'{url_factory("stock")}?shop={target_product.shop.name}'
+        with django_capture_on_commit_callbacks(execute=True):
+            stock.shop.name = new_name
+            stock.shop.save(update_fields=["name"])
 
         response: Response = anon_client.get(url)
 
         assert response.status_code == 200
-        api_data: list[dict] = response.json()["results"]
-        db_data: list[dict] = StockSerializer(target_product).data
-        assert api_data == [db_data]
-
-    def test_ordering_by_price_success(
-        self, anon_client: CustomAPIClient, stock_factory, url_factory
+        assert response.json()["results"][0]["shop"] == new_name
+
+
+class TestGetListSharedStock:
+    @pytest.mark.parametrize(
+        ["query_param", "attr_path"],
+        [
+            pytest.param("model", "product.model", id="filter_by_model"),
+            pytest.param("name", "product.name", id="filter_by_name"),
+            pytest.param("category", "product.category.name", id="filter_by_category"),
+            pytest.param("shop", "shop.name", id="filter_by_shop"),
+            pytest.param("search", "product.model", id="searching_by_model"),
+            pytest.param("search", "product.name", id="searching_by_name"),
+            pytest.param("search", "product.category.name", id="searching_by_category"),
+            pytest.param("search", "shop.name", id="searching_by_shop"),
+        ],
+    )
+    def test_filter_success(
+        self,
+        anon_client: CustomAPIClient,
+        stock_set: tuple[list[Stock], list[dict]],
+        url_factory,
+        query_param: str,
+        attr_path: str,
     ):
-        stock_quantity = 3
-        products: list[Stock] = stock_factory(stock_quantity)
-        url: str = f'{url_factory("stock")}?ordering=price'
+        stocks, stocks_data = stock_set
+        target_product: Stock = stocks[0]
+        value: str = operator.attrgetter(attr_path)(target_product)
+        url: str = f'{url_factory("stock")}?{query_param}={value}'
 
         response: Response = anon_client.get(url)
 
         assert response.status_code == 200
         api_data: list[dict] = response.json()["results"]
-        db_data: list[dict] = sorted(
-            StockSerializer(products, many=True).data, key=lambda x: x["price"]
-        )
-        assert api_data == db_data
-
-    def test_ordering_by_quantity_success(
-        self, anon_client: CustomAPIClient, stock_factory, url_factory
+        assert api_data == [stocks_data[0]]
+
+    @pytest.mark.parametrize(
+        ["ordering", "sort_key", "reverse"],
+        [
+            pytest.param("price", "price", False, id="ordering_by_price"),
+            pytest.param("-quantity", "quantity", True, id="ordering_by_quantity"),
+        ],
+    )
+    def test_ordering_success(
+        self,
+        anon_client: CustomAPIClient,
+        stock_set: tuple[list[Stock], list[dict]],
+        url_factory,
+        ordering: str,
+        sort_key: str,
+        reverse: bool,
     ):
-        stock_quantity = 3
-        products: list[Stock] = stock_factory(stock_quantity)
-        url: str = f'{url_factory("stock")}?ordering=-quantity'
+        url: str = f'{url_factory("stock")}?ordering={ordering}'
 
         response: Response = anon_client.get(url)
 
         assert response.status_code == 200
         api_data: list[dict] = response.json()["results"]
-        db_data: list[dict] = sorted(
-            StockSerializer(products, many=True).data, key=lambda x: x["quantity"], reverse=True
-        )
+        _, stocks_data = stock_set
+        db_data: list[dict] = sorted(stocks_data, key=lambda x: x[sort_key], reverse=reverse)
         assert api_data == db_data
-
-    def test_searching_by_model_success(
-        self, anon_client: CustomAPIClient, stock_factory, url_factory
-    ):
-        stock_quantity = 3
-        products: list[Stock] = stock_factory(stock_quantity)
-        target_product: Stock = products[0]
-        url: str = f'{url_factory("stock")}?search={target_product.product.model}'
-
-        response: Response = anon_client.get(url)
-
-        assert response.status_code == 200
-        api_data: list[dict] = response.json()["results"]
-        db_data: list[dict] = StockSerializer(target_product).data
-        assert api_data == [db_data]
-
-    def test_searching_by_name_success(
-        self, anon_client: CustomAPIClient, stock_factory, url_factory
-    ):
-        stock_quantity = 3
-        products: list[Stock] = stock_factory(stock_quantity)
-        target_product: Stock = products[0]
-        url: str = f'{url_factory("stock")}?search={target_product.product.name}'
-
-        response: Response = anon_client.get(url)
-
-        assert response.status_code == 200
-        api_data: list[dict] = response.json()["results"]
-        db_data: list[dict] = StockSerializer(target_product).data
-        assert api_data == [db_data]
-
-    def test_searching_by_category_success(
-        self, anon_client: CustomAPIClient, stock_factory, url_factory
-    ):
-        stock_quantity = 3
-        products: list[Stock] = stock_factory(stock_quantity)
-        target_product: Stock = products[0]
-        url: str = f'{url_factory("stock")}?category={target_product.product.category.name}'
-
-        response: Response = anon_client.get(url)
-
-        assert response.status_code == 200
-        api_data: list[dict] = response.json()["results"]
-        db_data: dict = StockSerializer(target_product).data
-        assert api_data == [db_data]
-
-    def test_searching_by_shop_success(
-        self, anon_client: CustomAPIClient, stock_factory, url_factory
-    ):
-        stock_quantity = 3
-        products: list[Stock] = stock_factory(stock_quantity)
-        target_product: Stock = products[0]
-        url: str = f'{url_factory("stock")}?shop={target_product.shop.name}'
-
-        response: Response = anon_client.get(url)
-
-        assert response.status_code == 200
-        api_data: list[dict] = response.json()["results"]
-        db_data: dict = StockSerializer(target_product).data
-        assert api_data == [db_data]
@@ -1,5 +1,3 @@
-from uuid import UUID
-
 import pytest
 from django.contrib.auth.hashers import check_password
 from django.core.exceptions import ObjectDoesNotExist
@@ -7,7 +5,7 @@ from django.core.mail import EmailMessage
 from faker import Faker
 from rest_framework.response import Response
 
-from autopurchases.models import Contact, PasswordResetToken, User
+from autopurchases.models import Contact, PasswordResetToken, User, generate_reset_token
 from autopurchases.serializers import UserSerializer
 from tests.utils import CustomAPIClient, sorted_list_of_dicts_by_id
 
@@ -17,7 +15,7 @@ pytestmark = pytest.mark.django_db
 class TestGetList:
     def test_success(self, anon_client: CustomAPIClient, user_factory, url_factory):
         users_quantity = 5
-        users: list[User] = user_factory(users_quantity)
+        users: list[User] = user_factory(users_quantity, bulk=True)
         url: str = url_factory("user-list")
 
         response: Response = anon_client.get(url)
@@ -32,7 +30,7 @@ class TestGetList:
     ):
         difference = 5
         users_quantity = settings.REST_FRAMEWORK["PAGE_SIZE"] + difference
-        user_factory(users_quantity)
+        user_factory(users_quantity, bulk=True)
         url: str = f'{url_factory("user-list")}?page=2'
 
         response: Response = anon_client.get(url)
@@ -70,13 +68,15 @@ class TestPost:
         anon_client: CustomAPIClient,
         user_factory,
         url_factory,
-        transactional_db,
         mailoutbox,
+        django_capture_on_commit_callbacks,
     ):
         user_info: dict = user_factory(as_dict=True)
         url: str = url_factory("user-list")
 
-        response: Response = anon_client.post(url, data=user_info)
+        # Письмо отправляется после фиксации транзакции (delay_on_commit)
+        with django_capture_on_commit_callbacks(execute=True):
+            response: Response = anon_client.post(url, data=user_info)
 
         assert response.status_code == 201
         api_data: dict = response.json()
@@ -142,9 +142,8 @@ class TestPatch:
 
         assert response.status_code == 200
         api_data: dict = response.json()
-        user.refresh_from_db(fields=["phone", "last_name"])
-        assert api_data["phone"] == user_info["phone"] == user.phone
-        assert api_data["last_name"] == user_info["last_name"] == user.last_name
+        assert api_data["phone"] == user_info["phone"]
+        assert api_data["last_name"] == user_info["last_name"]
         assert api_data["email"] == user.email
         assert api_data["first_name"] == user.first_name
 
@@ -209,10 +208,10 @@ class TestContacts:
 
         assert response.status_code == 201
         api_data: dict = response.json()
-        assert api_data["email"] == user_client.orm_user_obj.email
         contact_info = {key: str(value) for key, value in contact_info.items()}
-        contact_info["id"] = api_data["contacts"][0]["id"]
-        assert api_data["contacts"][0] == contact_info
+        contact_info["id"] = api_data["id"]
+        assert api_data == contact_info
+        assert user_client.orm_user_obj.contacts.filter(pk=api_data["id"]).exists()
 
     def test_create_admin_success(
         self, admin_client: CustomAPIClient, contact_factory, user_factory, url_factory
@@ -225,10 +224,10 @@ class TestContacts:
 
         assert response.status_code == 201
         api_data: dict = response.json()
-        assert api_data["email"] == user.email
         contact_info = {key: str(value) for key, value in contact_info.items()}
-        contact_info["id"] = api_data["contacts"][0]["id"]
-        assert api_data["contacts"][0] == contact_info
+        contact_info["id"] = api_data["id"]
+        assert api_data == contact_info
+        assert user.contacts.filter(pk=api_data["id"]).exists()
 
     def test_create_fail_not_owner(
         self, user_client: CustomAPIClient, contact_factory, user_factory, url_factory
@@ -255,8 +254,8 @@ class TestContacts:
     def test_delete_success(self, user_client: CustomAPIClient, contact_factory, url_factory):
         contacts_quantity = 2
         user: User = user_client.orm_user_obj
-        contacts: list[Contact] = contact_factory(contacts_quantity, user=user)
-        assert user.contacts.count() == contacts_quantity
+        contacts: list[Contact] = contact_factory(contacts_quantity, user=user, bulk=True)
+        assert len(contacts) == contacts_quantity
         target_contact_id: int = contacts[0].id
         url: str = url_factory("user-delete-contact", pk=user.id, contact_pk=target_contact_id)
 
@@ -272,8 +271,8 @@ class TestContacts:
     ):
         contacts_quantity = 2
         user: User = user_factory()
-        contacts: list[Contact] = contact_factory(contacts_quantity, user=user)
-        assert user.contacts.count() == contacts_quantity
+        contacts: list[Contact] = contact_factory(contacts_quantity, user=user, bulk=True)
+        assert len(contacts) == contacts_quantity
         target_contact_id: int = contacts[0].id
         url: str = url_factory("user-delete-contact", pk=user.id, contact_pk=target_contact_id)
 
@@ -289,8 +288,8 @@ class TestContacts:
     ):
         contacts_quantity = 2
         user: User = user_factory()
-        contacts: list[Contact] = contact_factory(contacts_quantity, user=user)
-        assert user.contacts.count() == contacts_quantity
+        contacts: list[Contact] = contact_factory(contacts_quantity, user=user, bulk=True)
+        assert len(contacts) == contacts_quantity
         target_contact_id: int = contacts[0].id
         url: str = url_factory("user-delete-contact", pk=user.id, contact_pk=target_contact_id)
 
@@ -303,8 +302,8 @@ class TestContacts:
     ):
         contacts_quantity = 2
         user: User = user_factory()
-        contacts: list[Contact] = contact_factory(contacts_quantity, user=user)
-        assert user.contacts.count() == contacts_quantity
+        contacts: list[Contact] = contact_factory(contacts_quantity, user=user, bulk=True)
+        assert len(contacts) == contacts_quantity
         target_contact_id: int = contacts[0].id
         url: str = url_factory("user-delete-contact", pk=user.id, contact_pk=target_contact_id)
 
@@ -319,13 +318,15 @@ class TestResetToken:
         anon_client: CustomAPIClient,
         user_factory,
         url_factory,
-        transactional_db,
         mailoutbox,
+        django_capture_on_commit_callbacks,
     ):
         user: User = user_factory()
         url: str = f'{url_factory("user-get-rtoken")}?email={user.email}'
 
-        response: Response = anon_client.get(url)
+        # Письмо отправляется после фиксации транзакции (delay_on_commit)
+        with django_capture_on_commit_callbacks(execute=True):
+            response: Response = anon_client.get(url)
 
         assert response.status_code == 200
         assert len(mailoutbox) == 1
@@ -338,13 +339,15 @@ class TestResetToken:
         anon_client: CustomAPIClient,
         user_factory,
         url_factory,
-        transactional_db,
         mailoutbox,
+        django_capture_on_commit_callbacks,
     ):
         user: User = user_factory()
         url: str = f'{url_factory("user-get-rtoken")}?email={user.email}&phone=12345'
 
-        response: Response = anon_client.get(url)
+        # Письмо отправляется после фиксации транзакции (delay_on_commit)
+        with django_capture_on_commit_callbacks(execute=True):
+            response: Response = anon_client.get(url)
 
         assert response.status_code == 200
         assert len(mailoutbox) == 1
@@ -373,7 +376,7 @@ class TestResetToken:
         self, anon_client: CustomAPIClient, faker: Faker, user_factory, url_factory
     ):
         user: User = user_factory()
-        rtoken: UUID = PasswordResetToken.objects.create(user=user).rtoken
+        rtoken: str = PasswordResetToken.objects.create(user=user).rtoken
         new_password: str = faker.password()
         reset_info = {"rtoken": rtoken, "password": new_password}
         url: str = url_factory("user-reset-password")
@@ -383,11 +386,12 @@ class TestResetToken:
         assert response.status_code == 200
         user.refresh_from_db(fields=["password"])
         assert check_password(new_password, user.password)
+        assert not PasswordResetToken.objects.filter(user=user).exists()
 
     def test_reset_fail_invalid_token(
         self, anon_client: CustomAPIClient, faker: Faker, url_factory
     ):
-        reset_info = {"rtoken": faker.uuid4(), "password": faker.password()}
+        reset_info = {"rtoken": generate_reset_token(), "password": faker.password()}
         url: str = url_factory("user-reset-password")
 
         response: Response = anon_client.patch(url, data=reset_info)
@@ -398,7 +402,7 @@ class TestResetToken:
         self, anon_client: CustomAPIClient, user_factory, url_factory
     ):
         user: User = user_factory()
-        rtoken: UUID = PasswordResetToken.objects.create(user=user).rtoken
+        rtoken: str = PasswordResetToken.objects.create(user=user).rtoken
         reset_info = {"rtoken": rtoken, "password": "simple"}
         url: str = url_factory("user-reset-password")
 
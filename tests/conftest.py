@@ -1,11 +1,20 @@
 import functools
+import json
+from collections.abc import Iterator
 
 import pytest
+import yaml
+from django.db import transaction
 from pytest_django.fixtures import SettingsWrapper
 from pytest_django.lazy_django import skip_if_no_django
-from rest_framework.reverse import reverse
 
-from tests.utils import (
+from autopurchases.models import Stock
+from autopurchases.serializers import StockSerializer
+
+# Подробные сообщения об ошибках для проверок во вспомогательных функциях тестов
+pytest.register_assert_rewrite("tests.utils")
+
+from tests.utils import (  # noqa: E402
     CartFactory,
     ContactFactory,
     CustomAPIClient,
@@ -14,6 +23,7 @@ from tests.utils import (
     StockFactory,
     UserFactory,
     factory_wrapper,
+    reverse_cached,
 )
 
 
@@ -23,8 +33,11 @@ def testing_environment():
 
     settings = SettingsWrapper()
     settings.CELERY_TASK_ALWAYS_EAGER = True
+    settings.CELERY_TASK_EAGER_PROPAGATES = True
     settings.CELERY_TASK_STORE_EAGER_RESULT = True
     settings.REST_FRAMEWORK["PAGE_SIZE"] = 5
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
     yield
     settings.finalize()
 
@@ -39,6 +52,12 @@ def contact_factory():
     return functools.partial(factory_wrapper, _base_factory=ContactFactory)
 
 
+@pytest.fixture(scope="module")
+def sample_contact_dict(contact_factory) -> dict:
+    """Фикстура данных контакта (адреса доставки), общих для тестов модуля."""
+    return contact_factory(as_dict=True)
+
+
 @pytest.fixture(scope="session")
 def shop_factory():
     return functools.partial(factory_wrapper, _base_factory=ShopFactory)
@@ -49,6 +68,25 @@ def stock_factory():
     return functools.partial(factory_wrapper, _base_factory=StockFactory)
 
 
+@pytest.fixture(scope="class")
+def stock_set(
+    django_db_setup, django_db_blocker, stock_factory
+) -> Iterator[tuple[list[Stock], list[dict]]]:
+    """Фикстура набора товаров на складе, общего для всех тестов класса.
+
+    Объекты создаются один раз внутри транзакции, которая откатывается по завершении тестов
+    класса. Транзакции отдельных тестов выполняются внутри нее как точки сохранения, поэтому
+    изменения, сделанные тестом, на остальные тесты класса не влияют.
+
+    Вместе с объектами возвращаются их сериализованные представления (в том же порядке),
+    полученные один раз при создании набора.
+    """
+    with django_db_blocker.unblock(), transaction.atomic():
+        stocks: list[Stock] = stock_factory(3)
+        yield stocks, StockSerializer(stocks, many=True).data
+        transaction.set_rollback(True)
+
+
 @pytest.fixture(scope="session")
 def cart_factory():
     return functools.partial(factory_wrapper, _base_factory=CartFactory)
@@ -59,6 +97,30 @@ def order_factory():
     return functools.partial(factory_wrapper, _base_factory=OrderFactory)
 
 
+@pytest.fixture(scope="session")
+def shop_yaml_bytes() -> bytes:
+    """Фикстура содержимого тестового файла shop_data.yaml (читается один раз за сессию)."""
+    with open("tests/test_data/shop_data.yaml", "rb") as fr:
+        return fr.read()
+
+
+@pytest.fixture(scope="session")
+def shop_yaml_dict(shop_yaml_bytes: bytes) -> dict:
+    return yaml.load(shop_yaml_bytes, Loader=yaml.CSafeLoader)
+
+
+@pytest.fixture(scope="session")
+def shop_json_bytes() -> bytes:
+    """Фикстура содержимого тестового файла shop_data.json (читается один раз за сессию)."""
+    with open("tests/test_data/shop_data.json", "rb") as fr:
+        return fr.read()
+
+
+@pytest.fixture(scope="session")
+def shop_json_dict(shop_json_bytes: bytes) -> dict:
+    return json.loads(shop_json_bytes)
+
+
 @pytest.fixture(scope="package")
 def url_factory(request):
     """Фикстура фабрики URL
@@ -74,13 +136,7 @@ def url_factory(request):
         '/api/v1/user/1/contacts/3/'
     """
     app_name = request.path.parent.name
-
-    @functools.lru_cache(maxsize=32)
-    def factory(url_name: str = "", /, app_name=app_name, **kwargs):
-        full_url_name = f"{app_name}:{url_name}"
-        return reverse(full_url_name, kwargs=kwargs)
-
-    return factory
+    return functools.partial(reverse_cached, app_name=app_name)
 
 
 @pytest.fixture(scope="function")
@@ -1,11 +1,16 @@
 import functools
+from collections.abc import Sequence
 from typing import Literal, TypeAlias
 
 import factory
+import orjson
 from django.contrib.auth import get_user_model
+from django.db.models import QuerySet, prefetch_related_objects
 from django.db.models.signals import post_save
+from django.test.client import JSON_CONTENT_TYPE_RE
+from django.utils.text import slugify
 from factory.django import DjangoModelFactory, Password, mute_signals
-from rest_framework.authtoken.models import Token
+from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
 from autopurchases.models import (
@@ -25,6 +30,30 @@ from autopurchases.models import (
 UserModel = get_user_model()
 
 
+class _BulkDjangoModelFactory(DjangoModelFactory):
+    """Базовая фабрика с пакетным созданием объектов одним запросом INSERT."""
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def create_batch_fast(cls, size: int, **kwargs) -> list:
+        """Метод пакетного создания объектов одним запросом INSERT.
+
+        Объекты создаются без вызова save(), сигналы post_save не отправляются. Фабрики,
+        которым нужна подготовка связанных объектов, переопределяют метод и сохраняют
+        построенные объекты через _bulk_save.
+
+        Примеры использования:
+            >>> ContactFactory.create_batch_fast(2, city="Moscow")
+        """
+        return cls._bulk_save(cls.build_batch(size, **kwargs))
+
+    @classmethod
+    def _bulk_save(cls, instances: list) -> list:
+        return cls._meta.model.objects.bulk_create(instances)
+
+
 class _CategoryFactory(DjangoModelFactory):
     """Фабрика модели Category."""
 
@@ -45,21 +74,11 @@ class _ParameterFactory(DjangoModelFactory):
         django_get_or_create = ("name",)
 
 
-class _ShopsManagersFactory(DjangoModelFactory):
-    """Фабрика модели ShopsManagers."""
-
-    manager: User = factory.SubFactory(factory="tests.utils.UserFactory")
-    shop: Shop = factory.SubFactory(factory="tests.utils.ShopFactory")
-
-    class Meta:
-        model = ShopsManagers
-
-
 class _ProductsParametersFactory(DjangoModelFactory):
     """Фабрика модели ProductsParameters."""
 
     product: Product = factory.SubFactory(factory="tests.utils._ProductFactory")
-    parameter: Parameter = factory.SubFactory(factory="tests.utils._ParameterFactory")
+    parameter: Parameter = factory.SubFactory(factory=_ParameterFactory)
     value: str = factory.Faker("word")
 
     class Meta:
@@ -69,7 +88,7 @@ class _ProductsParametersFactory(DjangoModelFactory):
 class _ProductFactory(DjangoModelFactory):
     """Фабрика модели Product."""
 
-    category: Category = factory.SubFactory(factory="tests.utils._CategoryFactory")
+    category: Category = factory.SubFactory(factory=_CategoryFactory)
     model: str = factory.Faker("word")
     name: str = factory.Faker("text", max_nb_chars=20)
     parameters: list["Parameter"] = factory.RelatedFactoryList(
@@ -80,21 +99,24 @@ class _ProductFactory(DjangoModelFactory):
         model = Product
         skip_postgeneration_save = True
 
+    class Params:
+        no_parameters = factory.Trait(parameters=None)
+
 
-class ContactFactory(DjangoModelFactory):
+class ContactFactory(_BulkDjangoModelFactory):
     """Фабрика модели Contact."""
 
     city: str = factory.Faker("city")
     street: str = factory.Faker("street_name")
-    house: int = factory.Faker("numerify", text=r"%%%")
-    apartment: int = factory.Faker("numerify", text=r"%%")
+    house: str = factory.Sequence(lambda n: str(100 + n % 900))
+    apartment: str = factory.Sequence(lambda n: str(10 + n % 90))
 
     class Meta:
         model = Contact
 
 
 @mute_signals(post_save)
-class UserFactory(DjangoModelFactory):
+class UserFactory(_BulkDjangoModelFactory):
     """Фабрика модели User.
 
     Примеры использования:
@@ -115,7 +137,7 @@ class UserFactory(DjangoModelFactory):
         True
     """
 
-    email: str = factory.Faker("free_email")
+    email: str = factory.Sequence(lambda n: f"user{n}@example.com")
     _password: str = factory.Maybe(
         decider="hashed",
         yes_declaration=Password(factory.SelfAttribute("password")),
@@ -134,9 +156,33 @@ class UserFactory(DjangoModelFactory):
         hashed = False
         password = factory.Faker("password")
 
+    @classmethod
+    def create_batch_fast(cls, size: int, **kwargs) -> list[User]:
+        """Метод пакетного создания пользователей.
+
+        Существующие пользователи по email не ищутся. Контакты пользователей предзагружаются
+        одним запросом для последующей сериализации.
+
+        Примеры использования:
+            >>> UserFactory.create_batch_fast(5, hashed=True)
+        """
+        users: list[User] = super().create_batch_fast(size, **kwargs)
+        prefetch_related_objects(users, "contacts")
+        return users
+
+
+class _ShopsManagersFactory(DjangoModelFactory):
+    """Фабрика модели ShopsManagers."""
+
+    manager: User = factory.SubFactory(factory=UserFactory)
+    shop: Shop = factory.SubFactory(factory="tests.utils.ShopFactory")
+
+    class Meta:
+        model = ShopsManagers
+
 
 @mute_signals(post_save)
-class ShopFactory(DjangoModelFactory):
+class ShopFactory(_BulkDjangoModelFactory):
     """Фабрика модели Shop."""
 
     name: str = factory.Faker("word")
@@ -152,33 +198,128 @@ class ShopFactory(DjangoModelFactory):
     class Params:
         no_managers = factory.Trait(managers=None)
 
+    @classmethod
+    def create_batch_fast(cls, size: int, **kwargs) -> list[Shop]:
+        """Метод пакетного создания магазинов.
+
+        Менеджер, не переданный явно, создается один на весь пакет, связи магазинов с ним
+        создаются вторым запросом INSERT. Slug формируется до сохранения.
+
+        Примеры использования:
+            >>> ShopFactory.create_batch_fast(5, manager=user)
+        """
+        manager: User = kwargs.pop("manager", None) or UserFactory()
+        instances: list[Shop] = cls.build_batch(size, no_managers=True, **kwargs)
+        for instance in instances:
+            instance.slug = slugify(instance.name)
+        shops: list[Shop] = cls._bulk_save(instances)
+        ShopsManagers.objects.bulk_create(
+            [ShopsManagers(shop=shop, manager=manager) for shop in shops]
+        )
+        return shops
+
 
 @mute_signals(post_save)
-class StockFactory(DjangoModelFactory):
+class StockFactory(_BulkDjangoModelFactory):
     """Фабрика модели Stock."""
 
     shop: Shop = factory.SubFactory(factory=ShopFactory)
     product: Product = factory.SubFactory(factory=_ProductFactory)
-    quantity: int = factory.Faker("pyint", min_value=10)
-    price: int = factory.Faker("pyint", min_value=10)
+    quantity: int = factory.Sequence(lambda n: 10 + n % 1000)
+    # Цена не совпадает с количеством, чтобы тесты различали эти поля
+    price: int = factory.Sequence(lambda n: 1000 + (n * 7) % 9000)
 
     class Meta:
         model = Stock
         skip_postgeneration_save = True
 
+    @classmethod
+    def create_batch_fast(cls, size: int, **kwargs) -> list[Stock]:
+        """Метод пакетного создания товаров на складе.
+
+        Магазин, не переданный явно, и категория товаров создаются одни на весь пакет. Товары
+        и их параметры создаются заранее, по одному запросу INSERT на модель.
+
+        Примеры использования:
+            >>> StockFactory.create_batch_fast(3, shop=shop, can_buy=False)
+        """
+        if "shop" not in kwargs:
+            kwargs["shop"] = ShopFactory()
+        products: list[Product] = Product.objects.bulk_create(
+            _ProductFactory.build_batch(size, category=_CategoryFactory(), no_parameters=True)
+        )
+        # Фабрика параметров ищет существующие объекты по имени, дубликаты исключаются
+        parameters: list[Parameter] = list(
+            {parameter.pk: parameter for parameter in _ParameterFactory.create_batch(2)}.values()
+        )
+        ProductsParameters.objects.bulk_create(
+            [
+                _ProductsParametersFactory.build(product=product, parameter=parameter)
+                for product in products
+                for parameter in parameters
+            ]
+        )
+        instances: list[Stock] = [cls.build(product=product, **kwargs) for product in products]
+        return cls._with_dependencies(cls._bulk_save(instances))
+
+    @classmethod
+    def create_batch(cls, size: int, **kwargs) -> list[Stock]:
+        return cls._with_dependencies(super().create_batch(size, **kwargs))
+
+    @classmethod
+    def _with_dependencies(cls, stocks: list[Stock]) -> list[Stock]:
+        """Метод повторной выборки созданных объектов вместе со связанными объектами.
+
+        Последующая сериализация объектов (например, для сравнения с ответом API) выполняется
+        без дополнительных запросов к базе данных.
+        """
+        return list(
+            Stock.objects.with_dependencies()
+            .filter(pk__in=[stock.pk for stock in stocks])
+            .order_by("id")
+        )
+
 
 @mute_signals(post_save)
-class CartFactory(DjangoModelFactory):
+class CartFactory(_BulkDjangoModelFactory):
     """Фабрика модели Cart."""
 
     customer: User = factory.SubFactory(factory=UserFactory)
     product: Stock = factory.SubFactory(factory=StockFactory)
-    quantity: int = factory.Faker("pyint", min_value=1, max_value=10)
+    quantity: int = factory.Sequence(lambda n: 1 + n % 10)
 
     class Meta:
         model = Cart
         skip_postgeneration_save = True
 
+    @classmethod
+    def create_batch_fast(cls, size: int, **kwargs) -> list[Cart]:
+        """Метод пакетного создания товаров в корзине.
+
+        Связанные объекты, не переданные явно, создаются заранее: покупатель - один на весь
+        пакет, товар на складе - для каждого объекта (параметры вида product__<field> передаются
+        фабрике StockFactory). Итоговая стоимость рассчитывается до сохранения.
+
+        Примеры использования:
+            >>> CartFactory.create_batch_fast(3, customer=user, product__can_buy=False)
+        """
+        stock_kwargs = {
+            key.removeprefix("product__"): kwargs.pop(key)
+            for key in list(kwargs)
+            if key.startswith("product__")
+        }
+        if "customer" not in kwargs:
+            kwargs["customer"] = UserFactory()
+        if "product" in kwargs:
+            products: list[Stock] = [kwargs.pop("product")] * size
+        else:
+            products: list[Stock] = StockFactory.create_batch_fast(size, **stock_kwargs)
+
+        instances: list[Cart] = [cls.build(product=product, **kwargs) for product in products]
+        for instance in instances:
+            instance.total_price = instance.product.price * instance.quantity
+        return cls._bulk_save(instances)
+
 
 @mute_signals(post_save)
 class OrderFactory(CartFactory):
@@ -190,6 +331,20 @@ class OrderFactory(CartFactory):
         model = Order
         skip_postgeneration_save = True
 
+    @classmethod
+    def create_batch_fast(cls, size: int, **kwargs) -> list[Order]:
+        """Метод пакетного создания заказов.
+
+        Адрес доставки, не переданный явно, создается один на весь пакет. Значения полей
+        модели (например, status) устанавливаются до сохранения, без повторного UPDATE.
+
+        Примеры использования:
+            >>> OrderFactory.create_batch_fast(3, customer=user, status="assembled")
+        """
+        if "delivery_address" not in kwargs:
+            kwargs["delivery_address"] = ContactFactory()
+        return super().create_batch_fast(size, **kwargs)
+
 
 class CustomAPIClient(APIClient):
     """Расширенный APIClient для тестирования API с поддержкой разных ролей пользователей.
@@ -216,19 +371,34 @@ class CustomAPIClient(APIClient):
         self._set_credentials()
 
     def _set_credentials(self):
-        token: Token = Token.objects.create(user=self.orm_user_obj)
-        self.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        # Аутентификация без создания токена и его проверки при каждом запросе
+        self.force_authenticate(user=self.orm_user_obj)
 
     def _create_admin_client(self):
-        with mute_signals(post_save):
-            admin: User = UserFactory(is_staff=True, is_superuser=True)
+        admin: User = UserFactory(is_staff=True, is_superuser=True)
         self.orm_user_obj = admin
 
     def _create_user_client(self):
-        with mute_signals(post_save):
-            user: User = UserFactory()
+        user: User = UserFactory()
         self.orm_user_obj = user
 
+    def _parse_json(self, response, **extra):
+        # Декодирование тела ответа через orjson вместо стандартного модуля json
+        if extra:
+            return super()._parse_json(response, **extra)
+        content_type: str = response.get("Content-Type")
+        if not JSON_CONTENT_TYPE_RE.match(content_type):
+            raise ValueError(f'Content-Type header is "{content_type}", not "application/json"')
+        return orjson.loads(response.content)
+
+    def post_json(self, path: str, data: dict, **extra):
+        """Метод отправки POST-запроса с телом, предварительно сериализованным в JSON."""
+        return self.generic("POST", path, orjson.dumps(data), "application/json", **extra)
+
+    def patch_json(self, path: str, data: dict, **extra):
+        """Метод отправки PATCH-запроса с телом, предварительно сериализованным в JSON."""
+        return self.generic("PATCH", path, orjson.dumps(data), "application/json", **extra)
+
     def set_hashed_password(self) -> str | None:
         """Метод хеширования пароля объекта пользователя self.orm_user_obj.
 
@@ -255,15 +425,82 @@ class CustomAPIClient(APIClient):
         return raw_password
 
 
-FACTORIES: TypeAlias = UserFactory | ShopFactory | ContactFactory | StockFactory
+FACTORIES: TypeAlias = (
+    UserFactory | ShopFactory | ContactFactory | StockFactory | CartFactory | OrderFactory
+)
 
 
 def factory_wrapper(size: int | None = None, /, _base_factory: FACTORIES | None = None, **kwargs):
     if kwargs.pop("as_dict", None) is not None:
         return _base_factory.stub(**kwargs).__dict__
+    if kwargs.pop("bulk", None) is not None:
+        return _base_factory.create_batch_fast(size, **kwargs)
     if size is not None:
         return _base_factory.create_batch(size, **kwargs)
     return _base_factory.create(**kwargs)
 
 
 sorted_list_of_dicts_by_id = functools.partial(sorted, key=lambda x: x["id"])
+
+
+@functools.lru_cache(maxsize=1024)
+def reverse_cached(url_name: str = "", /, app_name: str = "", **kwargs) -> str:
+    """Функция получения URL по имени с кешированием результата на всю тестовую сессию.
+
+    Ключ кеша - имя приложения, имя URL и переданные параметры.
+
+    Примеры использования:
+        >>> reverse_cached("user-delete-contact", app_name="autopurchases", pk=1, contact_pk=3)
+        '/api/v1/user/1/contacts/3/'
+    """
+    return reverse(f"{app_name}:{url_name}", kwargs=kwargs)
+
+
+def assert_same_by_id(first: Sequence[dict], second: Sequence[dict]) -> None:
+    """Функция сравнения двух наборов сериализованных объектов без учета порядка.
+
+    Объекты сопоставляются по id, без сортировки наборов.
+
+    Примеры использования:
+        >>> assert_same_by_id(response.json()["results"], StockSerializer(stock, many=True).data)
+    """
+    assert len(first) == len(second)
+    assert {item["id"]: item for item in first} == {item["id"]: item for item in second}
+
+
+def _freeze(value):
+    # Приведение вложенных словарей и списков к хешируемым кортежам
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def assert_subset_by_frozen(subset: Sequence[dict], superset: Sequence[dict]) -> None:
+    """Функция проверки вхождения каждого сериализованного объекта из subset в superset.
+
+    Объекты superset однократно приводятся к хешируемому виду, проверка вхождения выполняется
+    по множеству, а не перебором списка.
+
+    Примеры использования:
+        >>> assert_subset_by_frozen(response.json()["results"], serializer.data)
+    """
+    frozen_superset: set[tuple] = {_freeze(item) for item in superset}
+    for item in subset:
+        assert _freeze(item) in frozen_superset
+
+
+def to_dict_minimal(data: QuerySet | list[dict], fields: Sequence[str]) -> list[dict]:
+    """Функция формирования минимального представления объектов для сравнения в тестах.
+
+    Для QuerySet данные выбираются запросом values() без участия сериализатора, для списка
+    словарей (например, ответа API) отбираются только указанные ключи. Результат отсортирован
+    по id.
+
+    Примеры использования:
+        >>> to_dict_minimal(Order.objects.filter(customer=user), ("id", "total_price"))
+    """
+    if isinstance(data, QuerySet):
+        data = data.values(*fields)
+    return sorted_list_of_dicts_by_id([{field: item[field] for field in fields} for item in data])